@@ -0,0 +1,64 @@
+"""
+Record Transforms
+Per-record formatting loops used by the API endpoints.
+
+Kept free of Flask/PyMongo imports and fully annotated so the module can be
+compiled to a C extension with mypyc (`mypyc api/_transforms.py`); the
+interpreted module is used unchanged when no compiled build is present.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def transform_active_predictions(preds: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Format active prediction documents for the real-time display"""
+    result: List[Dict[str, Any]] = []
+    for pred in preds:
+        result.append({
+            'id': str(pred['_id']),
+            'starttime': pred['starttime'],
+            'video_no': pred['video_no'],
+            'probe': pred['probe'],  # HH, HL, LH, LL
+            'user_id': pred.get('user_id'),  # Include if present
+            'session_id': pred.get('session_id'),  # Include if present
+            'created_at': pred['created_at']
+        })
+    return result
+
+
+def transform_predictions(preds: Iterable[Dict[str, Any]],
+                          probe_lookup: Dict[str, Tuple[str, str]],
+                          unknown: Tuple[str, str]) -> List[Dict[str, Any]]:
+    """Format prediction documents as 5-second timeline segments with label and color"""
+    result: List[Dict[str, Any]] = []
+    for pred in preds:
+        probe = pred['probe']
+        emotion_label, color = probe_lookup.get(probe, unknown)
+        result.append({
+            'starttime': pred['starttime'],
+            'video_no': pred['video_no'],
+            'probe': probe,
+            'emotion_label': emotion_label,
+            'color': color,
+            'segment_duration': 5000,  # 5 seconds in milliseconds
+            'created_at': pred['created_at']
+        })
+    return result
+
+
+def emotion_timeline_entry(segment: int, feature: Dict[str, Any],
+                           labels: Dict[Tuple[int, int], str]) -> Dict[str, Any]:
+    """Format one features document as an emotion timeline segment"""
+    v = feature['valence_acc_video']
+    a = feature['arousal_acc_video']
+    return {
+        'segment': segment,
+        'start_time': feature['start_time'],
+        'video_id': feature['video_id'],
+        'emotion': labels.get((v, a), 'Unknown'),
+        'valence': v,
+        'arousal': a,
+        'gsr_diff': feature['gsr_diff'],
+        'hr_diff': feature['hr_diff'],
+        'change_score': feature['score']
+    }
@@ -0,0 +1,42 @@
+"""
+Response Cache
+Short-lived in-process cache for serialized JSON responses.
+
+Read-heavy endpoints (video timelines, session summary) return the same payload
+for every poll once a session has finished, so the encoded bytes are kept here
+with a TTL and served without touching MongoDB.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# key -> (expires_at, payload)
+_cache: Dict[str, Tuple[float, bytes]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_cached(key: str) -> Optional[bytes]:
+    """Return the cached payload for key, or None if missing/expired."""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, payload = entry
+    if expires_at < time.monotonic():
+        with _cache_lock:
+            _cache.pop(key, None)
+        return None
+    return payload
+
+
+def set_cached(key: str, payload: bytes, ttl: float):
+    """Store payload under key for ttl seconds."""
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + ttl, payload)
+
+
+def invalidate_prefix(prefix: str):
+    """Drop every cached entry whose key starts with prefix."""
+    with _cache_lock:
+        for key in [k for k in _cache if k.startswith(prefix)]:
+            del _cache[key]
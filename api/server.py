@@ -3,16 +3,31 @@ Emotion Analysis API Server
 Provides REST endpoints for emotion tracking, predictions, and physiological data.
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import functools
 import sys
 import os
+import time
 import logging
 
+import orjson
+
+# Optional response compression (pip install flask-compress)
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+
 # Add parent directory to path to import db_models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from db_config import initialize_indexes
 from db_models import (
     get_active_predictions,
     get_all_predictions,
@@ -24,11 +39,18 @@ from db_models import (
     get_video_starts_by_id,
     get_latest_video_start,
     get_database_stats,
-    get_collection
+    get_collection,
+    active_prediction_live_filter
 )
 
 # Import video session manager blueprint
-from api.video_session_manager import video_session_bp
+from api.video_session_manager import video_session_bp, VideoSessionManager, VIDEO_DURATIONS
+from api.response_cache import get_cached, set_cached
+from api._transforms import (
+    transform_active_predictions,
+    transform_predictions,
+    emotion_timeline_entry
+)
 
 # Configure logging
 logging.basicConfig(
@@ -37,13 +59,206 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# Cache lifetimes (seconds) for read-heavy endpoints
+PREDICTIONS_CACHE_TTL = 300
+SUMMARY_CACHE_TTL = 10
+STATS_CACHE_SECONDS = 5
+
+# Emotion mapping (Valence-Arousal to emotion labels)
+EMOTION_MAP = {
+    'HH': 'Happy',      # High valence, high arousal → Happy/Excited
+    'HL': 'Neutral',    # High valence, low arousal → Calm/Peaceful
+    'LH': 'Angry',      # Low valence, high arousal → Anxious/Angry
+    'LL': 'Sad'         # Low valence, low arousal → Sad/Bored
+}
+
+# Opportuneness labels used by the predictions timeline
+TIMELINE_LABEL_MAP = {
+    'HH': 'High Opportuneness (Positive)',
+    'HL': 'Moderate Opportuneness (Transitioning)',
+    'LH': 'Moderate Opportuneness (Building)',
+    'LL': 'Low Opportuneness (Not Opportune)'
+}
+
+# Color mapping (same as old frontend for consistency)
+COLOR_MAP = {
+    'HH': '#eecdac',  # Beige - Highly opportune
+    'HL': '#7fc087',  # Green - Moderately opportune
+    'LH': '#f4978e',  # Pink - Building opportune
+    'LL': '#879af0'   # Blue - Not opportune
+}
+
+# probe -> (timeline label, color), so the timeline loop does one lookup per record
+_PROBE_LOOKUP = {p: (TIMELINE_LABEL_MAP[p], COLOR_MAP[p]) for p in ('HH', 'HL', 'LH', 'LL')}
+_UNKNOWN_PROBE = ('Unknown', '#999999')
+
+# (valence, arousal) -> emotion label for the session emotion timeline
+TIMELINE_EMOTION_LABELS = {
+    (1, 1): 'Happy/Excited',
+    (1, 0): 'Calm/Peaceful',
+    (0, 1): 'Anxious/Stressed',
+    (0, 0): 'Sad/Bored'
+}
+
+_ORJSON_OPTION = orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(obj):
+    """Fallback for types orjson does not serialize natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_bytes(obj):
+    """Encode obj exactly as jsonify() does, for responses cached as bytes"""
+    return orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTION)
+
+
+def _int_arg(name, default=None):
+    """Integer query parameter; default when missing or not an integer (as type=int)"""
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _probe_switch(mapping, default):
+    """Build a $switch expression mapping the document's probe through mapping"""
+    return {
+        '$switch': {
+            'branches': [
+                {'case': {'$eq': ['$probe', probe]}, 'then': value}
+                for probe, value in mapping.items()
+            ],
+            'default': default
+        }
+    }
+
+
+# $project stage turning a prediction document into a timeline segment
+_SEGMENT_PROJECTION = {'$project': {
+    '_id': 0,
+    'timestamp': {'$ifNull': ['$starttime', 0]},
+    'probe': {'$ifNull': ['$probe', '']},
+    'emotion': _probe_switch(EMOTION_MAP, 'Neutral'),
+    'color': _probe_switch(COLOR_MAP, '#999999'),
+    'cluster_id': {'$ifNull': ['$cluster_id', 0]}
+}}
+
+
+# find() projections: fetch only the fields each handler reads
+_TIMELINE_PREDICTION_FIELDS = {'_id': 0, 'starttime': 1, 'video_no': 1, 'probe': 1, 'created_at': 1}
+_CURRENT_EMOTION_FIELDS = {
+    '_id': 0, 'start_time': 1, 'video_id': 1, 'valence_acc_video': 1, 'arousal_acc_video': 1,
+    'score': 1, 'gsr_diff': 1, 'hr_diff': 1, 'previous_window': 1, 'created_at': 1
+}
+_EMOTION_TIMELINE_FIELDS = {
+    '_id': 0, 'start_time': 1, 'video_id': 1, 'valence_acc_video': 1, 'arousal_acc_video': 1,
+    'score': 1, 'gsr_diff': 1, 'hr_diff': 1
+}
+_VIDEO_HISTORY_FIELDS = {'video_id': 1, 'timestamp': 1, 'created_at': 1}
+
+# $project stages shaping documents into response records server-side
+_EMOTION_HISTORY_PROJECTION = {'$project': {
+    '_id': 0,
+    'id': {'$toString': '$_id'},
+    'start_time': '$start_time',
+    'video_id': '$video_id',
+    'valence': '$valence_acc_video',
+    'arousal': '$arousal_acc_video',
+    'change_score': '$score',
+    'gsr_diff': '$gsr_diff',
+    'hr_diff': '$hr_diff',
+    'created_at': '$created_at'
+}}
+_LATEST_SIGNAL_PROJECTION = {'$project': {
+    '_id': 0,
+    'time_series': '$time_series',
+    'gsr': '$gsr',
+    'hr': '$hr',
+    'timestamp': '$timestamp',
+    'datetime': {'$ifNull': ['$datetime', '']},
+    'created_at': '$created_at'
+}}
+
+# Documents per cursor batch; small projected documents fit many per getMore round-trip
+_CURSOR_BATCH_SIZE = 1000
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson so every jsonify() call uses the C encoder.
+
+    datetime values are serialized natively as ISO-8601. They are naive local
+    times (datetime.now()), so OPT_NAIVE_UTC is deliberately not set - tagging
+    them as UTC would shift every timestamp the frontend displays.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return _json_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(_json_bytes(obj), mimetype='application/json')
+
+
+@functools.lru_cache(maxsize=1)
+def _stats_cached(bucket):
+    """get_database_stats() memoized per time bucket"""
+    return get_database_stats()
+
+
+def _database_stats():
+    """Collection counts, refreshed at most once every STATS_CACHE_SECONDS"""
+    return _stats_cached(int(time.time()) // STATS_CACHE_SECONDS)
+
+
+# Worker pool for overlapping independent MongoDB round-trips within a request.
+# PyMongo releases the GIL while waiting on the socket, so the waits run concurrently.
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='api-io')
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for frontend access
 
+# Compress JSON bodies over 1 KB (brotli preferred, gzip fallback). Streamed
+# responses such as the NDJSON timeline are left uncompressed so rows still
+# reach the client as they are produced.
+app.config.update(
+    COMPRESS_MIN_SIZE=1024,
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_STREAMS=False
+)
+if COMPRESS_AVAILABLE:
+    Compress(app)
+else:
+    logger.warning("⚠️  flask-compress not installed - responses will not be compressed")
+
 # Register video session blueprint
 app.register_blueprint(video_session_bp)
 logger.info("✅ Video session manager registered")
 
+# Startup hook: make sure the indexes behind the query shapes below exist
+# (create_index is a no-op for indexes that are already present)
+initialize_indexes()
+
+# Collection handles are thread-safe; resolve them once instead of per request
+_PREDICTIONS = get_collection('predictions')
+_ACTIVE_PREDICTIONS = get_collection('active_predictions')
+_FEATURES = get_collection('features')
+_SIGNALS = get_collection('signals')
+_VIDEO_STARTS = get_collection('video_starts')
+
 # ============================================================================
 # HEALTH & STATUS ENDPOINTS
 # ============================================================================
@@ -68,7 +283,8 @@ def home():
             'video_start': 'POST /api/video/start',
             'video_stop': 'POST /api/video/stop',
             'video_predictions': 'GET /api/predictions/video/<video_id>',
-            'session_status': 'GET /api/video/session/<session_id>'
+            'session_status': 'GET /api/video/session/<session_id>',
+            'emotion_timeline_stream': 'GET /api/session/emotion-timeline/ndjson'
         }
     })
 
@@ -76,11 +292,11 @@ def home():
 def health():
     """Check API and database health"""
     try:
-        stats = get_database_stats()
+        stats = _database_stats()
         return jsonify({
             'status': 'healthy',
             'database': 'connected',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.now(),
             'collections': stats
         })
     except Exception as e:
@@ -88,18 +304,18 @@ def health():
             'status': 'unhealthy',
             'database': 'disconnected',
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         }), 500
 
 @app.route('/api/stats')
 def stats():
     """Get database statistics"""
     try:
-        stats = get_database_stats()
+        stats = _database_stats()
         return jsonify({
             'success': True,
             'data': stats,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -123,7 +339,7 @@ def get_active_preds():
     - session_id (optional): Filter by session
     """
     try:
-        video_id = request.args.get('video_id', type=int)
+        video_id = _int_arg('video_id')
         user_id = request.args.get('user_id')
         session_id = request.args.get('session_id')
         
@@ -131,23 +347,13 @@ def get_active_preds():
         predictions = get_active_predictions(video_id, user_id, session_id)
         
         # Convert ObjectId to string for JSON serialization
-        result = []
-        for pred in predictions:
-            result.append({
-                'id': str(pred['_id']),
-                'starttime': pred['starttime'],
-                'video_no': pred['video_no'],
-                'probe': pred['probe'],  # HH, HL, LH, LL
-                'user_id': pred.get('user_id'),  # Include if present
-                'session_id': pred.get('session_id'),  # Include if present
-                'created_at': pred['created_at'].isoformat()
-            })
+        result = transform_active_predictions(predictions)
         
         return jsonify({
             'success': True,
             'count': len(result),
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -165,24 +371,28 @@ def get_all_preds():
     - offset (optional): Offset for pagination (default: 0)
     """
     try:
-        limit = request.args.get('limit', 100, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = _int_arg('limit', 100)
+        offset = _int_arg('offset', 0)
         
-        collection = get_collection('predictions')
-        predictions = list(collection.find().sort('created_at', -1).skip(offset).limit(limit))
+        collection = _PREDICTIONS
         
-        result = []
-        for pred in predictions:
-            result.append({
-                'id': str(pred['_id']),
-                'starttime': pred['starttime'],
-                'video_no': pred['video_no'],
-                'probe': pred['probe'],
-                'cluster_id': pred.get('cluster_id', 0),
-                'created_at': pred['created_at'].isoformat()
-            })
+        # Shape the records server-side so they come back in response layout
+        pipeline = [{'$sort': {'created_at': -1}}, {'$skip': offset}]
+        if limit > 0:
+            pipeline.append({'$limit': limit})
+        pipeline.append({'$project': {
+            '_id': 0,
+            'id': {'$toString': '$_id'},
+            'starttime': 1,
+            'video_no': 1,
+            'probe': 1,
+            'cluster_id': {'$ifNull': ['$cluster_id', 0]},
+            'created_at': 1
+        }})
+        result = list(collection.aggregate(pipeline, batchSize=_CURSOR_BATCH_SIZE))
         
-        total_count = collection.count_documents({})
+        # Unfiltered total: read from collection metadata instead of counting
+        total_count = collection.estimated_document_count()
         
         return jsonify({
             'success': True,
@@ -191,7 +401,7 @@ def get_all_preds():
             'limit': limit,
             'offset': offset,
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -236,8 +446,17 @@ def get_predictions_by_video(video_id):
         user_id = request.args.get('user_id')
         session_id = request.args.get('session_id')
         
+        # Finished sessions never change, so serve repeat polls from cache.
+        # While the video is still being processed new segments keep arriving.
+        cache_key = f"predvid:{video_id}:{user_id}:{session_id}"
+        cacheable = not VideoSessionManager.is_video_processing(video_id)
+        if cacheable:
+            cached = get_cached(cache_key)
+            if cached is not None:
+                return Response(cached, mimetype='application/json')
+        
         # Query predictions for this video
-        collection = get_collection('predictions')
+        collection = _PREDICTIONS
         query = {'video_no': video_id}
         
         # Add filters if provided (for multi-user support)
@@ -247,57 +466,30 @@ def get_predictions_by_video(video_id):
         if session_id:
             query['session_id'] = session_id
         
-        predictions = list(collection.find(query).sort('starttime', 1))
-        
-        # Emotion mapping (Valence-Arousal to emotion labels)
-        emotion_map = {
-            'HH': 'Happy',      # High valence, high arousal → Happy/Excited
-            'HL': 'Neutral',    # High valence, low arousal → Calm/Peaceful
-            'LH': 'Angry',      # Low valence, high arousal → Anxious/Angry
-            'LL': 'Sad'         # Low valence, low arousal → Sad/Bored
-        }
-        
-        # Color mapping (same as old frontend for consistency)
-        color_map = {
-            'HH': '#eecdac',  # Beige - Highly opportune
-            'HL': '#7fc087',  # Green - Moderately opportune
-            'LH': '#f4978e',  # Pink - Building opportune
-            'LL': '#879af0'   # Blue - Not opportune
-        }
-        
-        # Video duration mapping (milliseconds)
-        video_durations = {
-            1: 180000,  # 180 seconds
-            2: 151000,  # 151 seconds
-            3: 160000,  # 160 seconds
-            4: 117000   # 117 seconds
-        }
-        
-        # Transform predictions to segments
+        # Transform predictions to segments inside MongoDB
         segments = []
-        for idx, pred in enumerate(predictions):
-            probe = pred.get('probe', '')
-            timestamp = pred.get('starttime', 0)
-            
-            segments.append({
-                'segment_index': idx,
-                'timestamp': timestamp,
-                'probe': probe,
-                'emotion': emotion_map.get(probe, 'Neutral'),
-                'color': color_map.get(probe, '#999999'),
-                'cluster_id': pred.get('cluster_id', 0)
-            })
+        for idx, segment in enumerate(collection.aggregate([
+            {'$match': query},
+            {'$sort': {'starttime': 1}},
+            _SEGMENT_PROJECTION
+        ], batchSize=_CURSOR_BATCH_SIZE)):
+            segment['segment_index'] = idx
+            segments.append(segment)
         
         logger.info(f"📊 Retrieved {len(segments)} predictions for video {video_id}")
         
-        return jsonify({
+        payload = _json_bytes({
             'success': True,
             'video_id': video_id,
             'segments': segments,
             'total': len(segments),
-            'duration_ms': video_durations.get(video_id, 0),
-            'timestamp': datetime.now().isoformat()
+            'duration_ms': VIDEO_DURATIONS.get(video_id, 0),
+            'timestamp': datetime.now()
         })
+        if cacheable:
+            set_cached(cache_key, payload, PREDICTIONS_CACHE_TTL)
+        
+        return Response(payload, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"❌ Error fetching predictions for video {video_id}: {e}")
@@ -317,49 +509,30 @@ def get_predictions_timeline():
     - video_id (required): Video ID
     """
     try:
-        video_id = request.args.get('video_id', type=int)
+        video_id = _int_arg('video_id')
         if video_id is None:
             return jsonify({
                 'success': False,
                 'error': 'video_id parameter is required'
             }), 400
         
-        collection = get_collection('active_predictions')
-        predictions = list(collection.find({'video_no': video_id}).sort('starttime', 1))
+        collection = _ACTIVE_PREDICTIONS
+        predictions = (
+            collection.find({'video_no': video_id, 'expires_at': active_prediction_live_filter()},
+                            _TIMELINE_PREDICTION_FIELDS)
+            .sort('starttime', 1)
+            .batch_size(_CURSOR_BATCH_SIZE)
+        )
         
-        # Format for timeline with emotion labels
-        emotion_map = {
-            'HH': 'High Opportuneness (Positive)',
-            'HL': 'Moderate Opportuneness (Transitioning)',
-            'LH': 'Moderate Opportuneness (Building)',
-            'LL': 'Low Opportuneness (Not Opportune)'
-        }
-        
-        color_map = {
-            'HH': '#eecdac',  # Beige
-            'HL': '#7fc087',  # Green
-            'LH': '#f4978e',  # Red/Pink
-            'LL': '#879af0'   # Blue
-        }
-        
-        result = []
-        for pred in predictions:
-            result.append({
-                'starttime': pred['starttime'],
-                'video_no': pred['video_no'],
-                'probe': pred['probe'],
-                'emotion_label': emotion_map.get(pred['probe'], 'Unknown'),
-                'color': color_map.get(pred['probe'], '#999999'),
-                'segment_duration': 5000,  # 5 seconds in milliseconds
-                'created_at': pred['created_at'].isoformat()
-            })
+        # Format for timeline with emotion labels, consuming the cursor batch by batch
+        result = transform_predictions(predictions, _PROBE_LOOKUP, _UNKNOWN_PROBE)
         
         return jsonify({
             'success': True,
             'video_id': video_id,
             'count': len(result),
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -378,8 +551,8 @@ def get_current_emotions():
     Returns valence, arousal, and physiological differences
     """
     try:
-        collection = get_collection('features')
-        latest_feature = collection.find_one(sort=[('created_at', -1)])
+        collection = _FEATURES
+        latest_feature = collection.find_one({}, _CURRENT_EMOTION_FIELDS, sort=[('created_at', -1)])
         
         if not latest_feature:
             return jsonify({
@@ -409,13 +582,13 @@ def get_current_emotions():
             'gsr_diff': latest_feature['gsr_diff'],
             'hr_diff': latest_feature['hr_diff'],
             'previous_window': latest_feature['previous_window'],
-            'created_at': latest_feature['created_at'].isoformat()
+            'created_at': latest_feature['created_at']
         }
         
         return jsonify({
             'success': True,
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -435,10 +608,10 @@ def get_emotions_history():
     - limit (optional): Number of records (default: 100)
     """
     try:
-        start_time = request.args.get('start_time', type=int)
-        end_time = request.args.get('end_time', type=int)
-        video_id = request.args.get('video_id', type=int)
-        limit = request.args.get('limit', 100, type=int)
+        start_time = _int_arg('start_time')
+        end_time = _int_arg('end_time')
+        video_id = _int_arg('video_id')
+        limit = _int_arg('limit', 100)
         
         query = {}
         if start_time and end_time:
@@ -446,28 +619,20 @@ def get_emotions_history():
         if video_id is not None:
             query['video_id'] = video_id
         
-        collection = get_collection('features')
-        features = list(collection.find(query).sort('start_time', 1).limit(limit))
+        pipeline = [{'$match': query}, {'$sort': {'start_time': 1}}]
+        if limit > 0:
+            pipeline.append({'$limit': limit})
+        pipeline.append(_EMOTION_HISTORY_PROJECTION)
         
-        result = []
-        for feature in features:
-            result.append({
-                'id': str(feature['_id']),
-                'start_time': feature['start_time'],
-                'video_id': feature['video_id'],
-                'valence': feature['valence_acc_video'],
-                'arousal': feature['arousal_acc_video'],
-                'change_score': feature['score'],
-                'gsr_diff': feature['gsr_diff'],
-                'hr_diff': feature['hr_diff'],
-                'created_at': feature['created_at'].isoformat()
-            })
+        # Records come back already shaped; no per-document dict rebuild
+        collection = _FEATURES
+        result = list(collection.aggregate(pipeline, batchSize=_CURSOR_BATCH_SIZE))
         
         return jsonify({
             'success': True,
             'count': len(result),
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -482,8 +647,12 @@ def get_emotions_by_video(video_id):
     Shows emotional journey throughout the video
     """
     try:
-        collection = get_collection('features')
-        features = list(collection.find({'video_id': video_id}).sort('start_time', 1))
+        collection = _FEATURES
+        features = (
+            collection.find({'video_id': video_id}, _EMOTION_TIMELINE_FIELDS)
+            .sort('start_time', 1)
+            .batch_size(_CURSOR_BATCH_SIZE)
+        )
         
         result = []
         for feature in features:
@@ -502,7 +671,7 @@ def get_emotions_by_video(video_id):
             'video_id': video_id,
             'count': len(result),
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -523,30 +692,23 @@ def get_latest_signals():
     - count (optional): Number of latest readings (default: 50)
     """
     try:
-        count = request.args.get('count', 50, type=int)
+        count = _int_arg('count', 50)
         
-        collection = get_collection('signals')
-        signals = list(collection.find().sort('timestamp', -1).limit(count))
+        pipeline = [{'$sort': {'timestamp': -1}}]
+        if count > 0:
+            pipeline.append({'$limit': count})
+        # Back to chronological order after taking the newest readings
+        pipeline.append({'$sort': {'timestamp': 1}})
+        pipeline.append(_LATEST_SIGNAL_PROJECTION)
         
-        result = []
-        for signal in signals:
-            result.append({
-                'time_series': signal['time_series'],
-                'gsr': signal['gsr'],
-                'hr': signal['hr'],
-                'timestamp': signal['timestamp'],
-                'datetime': signal.get('datetime', ''),
-                'created_at': signal['created_at'].isoformat()
-            })
-        
-        # Reverse to get chronological order
-        result.reverse()
+        collection = _SIGNALS
+        result = list(collection.aggregate(pipeline, batchSize=_CURSOR_BATCH_SIZE))
         
         return jsonify({
             'success': True,
             'count': len(result),
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -564,8 +726,8 @@ def get_signals_range():
     - end_time (required): End timestamp in milliseconds
     """
     try:
-        start_time = request.args.get('start_time', type=int)
-        end_time = request.args.get('end_time', type=int)
+        start_time = _int_arg('start_time')
+        end_time = _int_arg('end_time')
         
         if start_time is None or end_time is None:
             return jsonify({
@@ -592,7 +754,7 @@ def get_signals_range():
             'start_time': start_time,
             'end_time': end_time,
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -606,46 +768,58 @@ def get_signals_stats():
     Get statistical summary of recent signals
     """
     try:
-        # Get last 100 signals
-        collection = get_collection('signals')
-        signals = list(collection.find().sort('timestamp', -1).limit(100))
+        # Reduce the last 100 signals inside MongoDB; only the aggregates come back
+        collection = _SIGNALS
+        summary = next(collection.aggregate([
+            {'$sort': {'timestamp': -1}},
+            {'$limit': 100},
+            {'$group': {
+                '_id': None,
+                'gsr_mean': {'$avg': '$gsr'},
+                'gsr_std': {'$stdDevPop': '$gsr'},
+                'gsr_min': {'$min': '$gsr'},
+                'gsr_max': {'$max': '$gsr'},
+                'hr_mean': {'$avg': '$hr'},
+                'hr_std': {'$stdDevPop': '$hr'},
+                'hr_min': {'$min': '$hr'},
+                'hr_max': {'$max': '$hr'},
+                'sample_count': {'$sum': 1},
+                'start': {'$min': '$timestamp'},
+                'end': {'$max': '$timestamp'}
+            }}
+        ]), None)
         
-        if not signals:
+        if not summary:
             return jsonify({
                 'success': True,
                 'data': None,
                 'message': 'No signals available'
             })
         
-        gsr_values = [s['gsr'] for s in signals]
-        hr_values = [s['hr'] for s in signals]
-        
-        import numpy as np
-        
         stats = {
             'gsr': {
-                'mean': float(np.mean(gsr_values)),
-                'std': float(np.std(gsr_values)),
-                'min': int(np.min(gsr_values)),
-                'max': int(np.max(gsr_values))
+                'mean': float(summary['gsr_mean']),
+                'std': float(summary['gsr_std']),
+                'min': int(summary['gsr_min']),
+                'max': int(summary['gsr_max'])
             },
             'hr': {
-                'mean': float(np.mean(hr_values)),
-                'std': float(np.std(hr_values)),
-                'min': int(np.min(hr_values)),
-                'max': int(np.max(hr_values))
+                'mean': float(summary['hr_mean']),
+                'std': float(summary['hr_std']),
+                'min': int(summary['hr_min']),
+                'max': int(summary['hr_max'])
             },
-            'sample_count': len(signals),
+            'sample_count': summary['sample_count'],
             'time_range': {
-                'start': signals[-1]['timestamp'],
-                'end': signals[0]['timestamp']
+                'start': summary['start'],
+                'end': summary['end']
             }
         }
         
         return jsonify({
             'success': True,
             'data': stats,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -673,13 +847,13 @@ def get_current_video():
         result = {
             'video_id': latest['video_id'],
             'start_timestamp': latest['timestamp'],
-            'started_at': latest['created_at'].isoformat()
+            'started_at': latest['created_at']
         }
         
         return jsonify({
             'success': True,
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -691,8 +865,12 @@ def get_current_video():
 def get_videos_history():
     """Get all video playback history"""
     try:
-        collection = get_collection('video_starts')
-        videos = list(collection.find().sort('created_at', -1))
+        collection = _VIDEO_STARTS
+        videos = (
+            collection.find({}, _VIDEO_HISTORY_FIELDS)
+            .sort('created_at', -1)
+            .batch_size(_CURSOR_BATCH_SIZE)
+        )
         
         result = []
         for video in videos:
@@ -700,14 +878,14 @@ def get_videos_history():
                 'id': str(video['_id']),
                 'video_id': video['video_id'],
                 'timestamp': video['timestamp'],
-                'started_at': video['created_at'].isoformat()
+                'started_at': video['created_at']
             })
         
         return jsonify({
             'success': True,
             'count': len(result),
             'data': result,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -726,15 +904,35 @@ def get_session_summary():
     Includes all videos watched, emotions experienced, predictions made
     """
     try:
-        stats = get_database_stats()
+        cached = get_cached('summary')
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
         
-        # Get video count
-        video_collection = get_collection('video_starts')
-        videos = list(video_collection.find().sort('created_at', 1))
+        # Issue the independent queries concurrently instead of back-to-back
+        stats_future = _io_pool.submit(_database_stats)
+        # Counting and ordering happen in MongoDB; only a few group documents come back
+        videos_future = _io_pool.submit(lambda: next(_VIDEO_STARTS.aggregate([
+            {'$sort': {'created_at': 1}},
+            {'$group': {
+                '_id': None,
+                'count': {'$sum': 1},
+                'video_list': {'$push': '$video_id'},
+                'start': {'$first': '$created_at'},
+                'latest': {'$last': '$created_at'}
+            }}
+        ]), None))
+        features_future = _io_pool.submit(lambda: list(_FEATURES.aggregate([
+            {'$group': {
+                '_id': {'v': '$valence_acc_video', 'a': '$arousal_acc_video'},
+                'n': {'$sum': 1}
+            }}
+        ])))
+        predictions_future = _io_pool.submit(lambda: list(_PREDICTIONS.aggregate([
+            {'$group': {'_id': '$probe', 'n': {'$sum': 1}}}
+        ])))
         
-        # Get emotion distribution
-        feature_collection = get_collection('features')
-        features = list(feature_collection.find())
+        stats = stats_future.result()
+        videos = videos_future.result() or {}
         
         emotion_dist = {
             'high_valence_high_arousal': 0,
@@ -743,46 +941,45 @@ def get_session_summary():
             'low_valence_low_arousal': 0
         }
         
-        for feature in features:
-            v = feature['valence_acc_video']
-            a = feature['arousal_acc_video']
+        for group in features_future.result():
+            v = group['_id'].get('v')
+            a = group['_id'].get('a')
             if v == 1 and a == 1:
-                emotion_dist['high_valence_high_arousal'] += 1
+                emotion_dist['high_valence_high_arousal'] += group['n']
             elif v == 1 and a == 0:
-                emotion_dist['high_valence_low_arousal'] += 1
+                emotion_dist['high_valence_low_arousal'] += group['n']
             elif v == 0 and a == 1:
-                emotion_dist['low_valence_high_arousal'] += 1
+                emotion_dist['low_valence_high_arousal'] += group['n']
             else:
-                emotion_dist['low_valence_low_arousal'] += 1
+                emotion_dist['low_valence_low_arousal'] += group['n']
         
         # Get prediction distribution
-        pred_collection = get_collection('predictions')
-        predictions = list(pred_collection.find())
-        
         prediction_dist = {'HH': 0, 'HL': 0, 'LH': 0, 'LL': 0}
-        for pred in predictions:
-            probe = pred.get('probe', '')
-            if probe in prediction_dist:
-                prediction_dist[probe] += 1
+        for group in predictions_future.result():
+            if group['_id'] in prediction_dist:
+                prediction_dist[group['_id']] = group['n']
         
         summary = {
             'session_stats': stats,
-            'videos_watched': len(videos),
-            'video_list': [v['video_id'] for v in videos],
+            'videos_watched': videos.get('count', 0),
+            'video_list': videos.get('video_list', []),
             'total_predictions': stats.get('predictions', 0),
             'emotion_distribution': emotion_dist,
             'prediction_distribution': prediction_dist,
             'session_duration': {
-                'start': videos[0]['created_at'].isoformat() if videos else None,
-                'latest': videos[-1]['created_at'].isoformat() if videos else None
+                'start': videos.get('start'),
+                'latest': videos.get('latest')
             }
         }
         
-        return jsonify({
+        payload = _json_bytes({
             'success': True,
             'data': summary,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
+        set_cached('summary', payload, SUMMARY_CACHE_TTL)
+        
+        return Response(payload, mimetype='application/json')
     except Exception as e:
         return jsonify({
             'success': False,
@@ -796,38 +993,23 @@ def get_emotion_timeline():
     Shows how user emotions changed over time across all videos
     """
     try:
-        collection = get_collection('features')
-        features = list(collection.find().sort('start_time', 1))
+        collection = _FEATURES
+        features = (
+            collection.find({}, _EMOTION_TIMELINE_FIELDS)
+            .sort('start_time', 1)
+            .batch_size(_CURSOR_BATCH_SIZE)
+        )
         
+        # Transform while iterating so fetched batches can be freed as we go
         timeline = []
-        for i, feature in enumerate(features):
-            v = feature['valence_acc_video']
-            a = feature['arousal_acc_video']
-            
-            emotion_label = {
-                (1, 1): 'Happy/Excited',
-                (1, 0): 'Calm/Peaceful',
-                (0, 1): 'Anxious/Stressed',
-                (0, 0): 'Sad/Bored'
-            }.get((v, a), 'Unknown')
-            
-            timeline.append({
-                'segment': i + 1,
-                'start_time': feature['start_time'],
-                'video_id': feature['video_id'],
-                'emotion': emotion_label,
-                'valence': v,
-                'arousal': a,
-                'gsr_diff': feature['gsr_diff'],
-                'hr_diff': feature['hr_diff'],
-                'change_score': feature['score']
-            })
+        for i, feature in enumerate(features, 1):
+            timeline.append(emotion_timeline_entry(i, feature, TIMELINE_EMOTION_LABELS))
         
         return jsonify({
             'success': True,
             'count': len(timeline),
             'data': timeline,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         })
     except Exception as e:
         return jsonify({
@@ -835,6 +1017,46 @@ def get_emotion_timeline():
             'error': str(e)
         }), 500
 
+@app.route('/api/session/emotion-timeline/ndjson')
+def stream_emotion_timeline():
+    """
+    Stream the emotion timeline as newline-delimited JSON
+    
+    Same segments as /api/session/emotion-timeline, one JSON object per line.
+    Rows are encoded straight off the cursor, so memory stays flat and the
+    client can start parsing before the last segment is read.
+    """
+    cursor = None
+    try:
+        cursor = (
+            _FEATURES.find({}, _EMOTION_TIMELINE_FIELDS)
+            .sort('start_time', 1)
+            .batch_size(_CURSOR_BATCH_SIZE)
+        )
+        # find() is lazy: pull the first batch now so a database error still
+        # gets the JSON 500 instead of a truncated 200 stream
+        first = next(cursor, None)
+    except Exception as e:
+        if cursor is not None:
+            cursor.close()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    def generate():
+        try:
+            if first is None:
+                return
+            yield _json_bytes(emotion_timeline_entry(1, first, TIMELINE_EMOTION_LABELS)) + b'\n'
+            for i, feature in enumerate(cursor, 2):
+                yield _json_bytes(emotion_timeline_entry(i, feature, TIMELINE_EMOTION_LABELS)) + b'\n'
+        finally:
+            # Also runs when the client disconnects mid-stream (generator closed)
+            cursor.close()
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
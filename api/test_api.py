@@ -4,32 +4,78 @@ Tests all endpoints to ensure they work correctly
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 BASE_URL = "http://localhost:5000"
 
-def test_endpoint(name, url, method="GET", params=None, expected_status=200):
-    """Test a single endpoint"""
+# One keep-alive connection pool for every test request
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+def check_endpoint(name, url, method="GET", params=None, expected_status=200):
+    """Test a single endpoint; returns (success, data, report line) without printing"""
     try:
         if method == "GET":
-            response = requests.get(url, params=params, timeout=5)
+            response = _SESSION.get(url, params=params, timeout=5)
         
         success = response.status_code == expected_status
         
         if success:
             data = response.json()
-            print(f"✅ {name}")
-            return True, data
+            return True, data, f"✅ {name}"
         else:
-            print(f"❌ {name} - Status: {response.status_code}")
-            return False, None
+            return False, None, f"❌ {name} - Status: {response.status_code}"
     except requests.exceptions.ConnectionError:
-        print(f"❌ {name} - Server not running")
-        return False, None
+        return False, None, f"❌ {name} - Server not running"
     except Exception as e:
-        print(f"❌ {name} - Error: {e}")
-        return False, None
+        return False, None, f"❌ {name} - Error: {e}"
+
+def test_endpoint(name, url, method="GET", params=None, expected_status=200):
+    """Test a single endpoint"""
+    success, data, line = check_endpoint(name, url, method, params, expected_status)
+    print(line)
+    return success, data
+
+# (section heading, [(name, url, params, expected_status), ...])
+TEST_SECTIONS = [
+    ("📊 Testing Health & Status Endpoints...", [
+        ("GET /", f"{BASE_URL}/", None, 200),
+        ("GET /api/health", f"{BASE_URL}/api/health", None, 200),
+        ("GET /api/stats", f"{BASE_URL}/api/stats", None, 200),
+    ]),
+    ("🎯 Testing Prediction Endpoints...", [
+        ("GET /api/predictions/active", f"{BASE_URL}/api/predictions/active", None, 200),
+        ("GET /api/predictions/active?video_id=2", f"{BASE_URL}/api/predictions/active", {'video_id': 2}, 200),
+        ("GET /api/predictions/all", f"{BASE_URL}/api/predictions/all", None, 200),
+        ("GET /api/predictions/all?limit=10", f"{BASE_URL}/api/predictions/all", {'limit': 10}, 200),
+        ("GET /api/predictions/timeline?video_id=2", f"{BASE_URL}/api/predictions/timeline", {'video_id': 2}, 200),
+    ]),
+    ("😊 Testing Emotion Endpoints...", [
+        ("GET /api/emotions/current", f"{BASE_URL}/api/emotions/current", None, 200),
+        ("GET /api/emotions/history", f"{BASE_URL}/api/emotions/history", None, 200),
+        ("GET /api/emotions/history?limit=10", f"{BASE_URL}/api/emotions/history", {'limit': 10}, 200),
+        ("GET /api/emotions/video/2", f"{BASE_URL}/api/emotions/video/2", None, 200),
+    ]),
+    ("📡 Testing Signal Endpoints...", [
+        ("GET /api/signals/latest", f"{BASE_URL}/api/signals/latest", None, 200),
+        ("GET /api/signals/latest?count=20", f"{BASE_URL}/api/signals/latest", {'count': 20}, 200),
+        ("GET /api/signals/stats", f"{BASE_URL}/api/signals/stats", None, 200),
+    ]),
+    ("🎬 Testing Video Endpoints...", [
+        ("GET /api/videos/current", f"{BASE_URL}/api/videos/current", None, 200),
+        ("GET /api/videos/history", f"{BASE_URL}/api/videos/history", None, 200),
+    ]),
+    ("📈 Testing Session Endpoints...", [
+        ("GET /api/session/summary", f"{BASE_URL}/api/session/summary", None, 200),
+        ("GET /api/session/emotion-timeline", f"{BASE_URL}/api/session/emotion-timeline", None, 200),
+    ]),
+    ("⚠️  Testing Error Handling...", [
+        ("GET /api/notfound (404)", f"{BASE_URL}/api/notfound", None, 404),
+    ]),
+]
 
 def main():
     print("\n" + "="*70)
@@ -39,7 +85,7 @@ def main():
     # Check if server is running
     print("🔍 Checking if API server is running...")
     try:
-        response = requests.get(BASE_URL, timeout=2)
+        response = _SESSION.get(BASE_URL, timeout=2)
         if response.status_code == 200:
             print("✅ API server is running\n")
         else:
@@ -50,121 +96,22 @@ def main():
         print("Please start the server with: python api/server.py\n")
         sys.exit(1)
     
-    results = []
+    # Endpoints are independent and read-only: issue them all concurrently,
+    # then report per section in the original order (ex.map preserves it)
+    cases = [case for _, section in TEST_SECTIONS for case in section]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        outcomes = iter(list(ex.map(
+            lambda c: check_endpoint(c[0], c[1], params=c[2], expected_status=c[3]), cases
+        )))
     
-    # Health & Status Endpoints
-    print("📊 Testing Health & Status Endpoints...")
-    results.append(test_endpoint(
-        "GET /", 
-        f"{BASE_URL}/"
-    ))
-    results.append(test_endpoint(
-        "GET /api/health", 
-        f"{BASE_URL}/api/health"
-    ))
-    results.append(test_endpoint(
-        "GET /api/stats", 
-        f"{BASE_URL}/api/stats"
-    ))
-    print()
-    
-    # Prediction Endpoints
-    print("🎯 Testing Prediction Endpoints...")
-    results.append(test_endpoint(
-        "GET /api/predictions/active", 
-        f"{BASE_URL}/api/predictions/active"
-    ))
-    results.append(test_endpoint(
-        "GET /api/predictions/active?video_id=2", 
-        f"{BASE_URL}/api/predictions/active",
-        params={'video_id': 2}
-    ))
-    results.append(test_endpoint(
-        "GET /api/predictions/all", 
-        f"{BASE_URL}/api/predictions/all"
-    ))
-    results.append(test_endpoint(
-        "GET /api/predictions/all?limit=10", 
-        f"{BASE_URL}/api/predictions/all",
-        params={'limit': 10}
-    ))
-    results.append(test_endpoint(
-        "GET /api/predictions/timeline?video_id=2", 
-        f"{BASE_URL}/api/predictions/timeline",
-        params={'video_id': 2}
-    ))
-    print()
-    
-    # Emotion Endpoints
-    print("😊 Testing Emotion Endpoints...")
-    results.append(test_endpoint(
-        "GET /api/emotions/current", 
-        f"{BASE_URL}/api/emotions/current"
-    ))
-    results.append(test_endpoint(
-        "GET /api/emotions/history", 
-        f"{BASE_URL}/api/emotions/history"
-    ))
-    results.append(test_endpoint(
-        "GET /api/emotions/history?limit=10", 
-        f"{BASE_URL}/api/emotions/history",
-        params={'limit': 10}
-    ))
-    results.append(test_endpoint(
-        "GET /api/emotions/video/2", 
-        f"{BASE_URL}/api/emotions/video/2"
-    ))
-    print()
-    
-    # Signal Endpoints
-    print("📡 Testing Signal Endpoints...")
-    results.append(test_endpoint(
-        "GET /api/signals/latest", 
-        f"{BASE_URL}/api/signals/latest"
-    ))
-    results.append(test_endpoint(
-        "GET /api/signals/latest?count=20", 
-        f"{BASE_URL}/api/signals/latest",
-        params={'count': 20}
-    ))
-    results.append(test_endpoint(
-        "GET /api/signals/stats", 
-        f"{BASE_URL}/api/signals/stats"
-    ))
-    print()
-    
-    # Video Endpoints
-    print("🎬 Testing Video Endpoints...")
-    results.append(test_endpoint(
-        "GET /api/videos/current", 
-        f"{BASE_URL}/api/videos/current"
-    ))
-    results.append(test_endpoint(
-        "GET /api/videos/history", 
-        f"{BASE_URL}/api/videos/history"
-    ))
-    print()
-    
-    # Session Endpoints
-    print("📈 Testing Session Endpoints...")
-    results.append(test_endpoint(
-        "GET /api/session/summary", 
-        f"{BASE_URL}/api/session/summary"
-    ))
-    results.append(test_endpoint(
-        "GET /api/session/emotion-timeline", 
-        f"{BASE_URL}/api/session/emotion-timeline"
-    ))
-    print()
-    
-    # Test error handling
-    print("⚠️  Testing Error Handling...")
-    results.append(test_endpoint(
-        "GET /api/notfound (404)", 
-        f"{BASE_URL}/api/notfound",
-        expected_status=404
-    ))
-    print()
+    results = []
+    for heading, section in TEST_SECTIONS:
+        print(heading)
+        for _ in section:
+            success, data, line = next(outcomes)
+            print(line)
+            results.append((success, data))
+        print()
     
     # Summary
     passed = sum(1 for r in results if r[0])
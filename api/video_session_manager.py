@@ -14,13 +14,21 @@ Author: Backend Team
 Date: 2024
 """
 
+import asyncio
+import atexit
+import functools
+import io
 import os
 import sys
 import time
 import logging
+import pickle
+import queue
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional, Any, List
+from typing import Deque, Dict, Optional, Any, List, NamedTuple, Tuple
 from flask import Blueprint, request, jsonify
 
 import pandas as pd
@@ -29,9 +37,19 @@ import numpy as np
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from api.response_cache import invalidate_prefix
+
+# Optional multi-threaded CSV parser for signals_data.csv (pip install pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 # Import database functions
 try:
-    from db_models import insert_video_start, clear_active_predictions
+    from db_models import insert_video_starts_bulk, clear_active_predictions
     DB_AVAILABLE = True
 except ImportError as e:
     DB_AVAILABLE = False
@@ -44,7 +62,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create Flask blueprint
+# Create Flask blueprint. Its jsonify() calls encode through the app's JSON
+# provider, which api/server.py sets to orjson, so the polled GET endpoints
+# (/api/video/sessions/active, /api/video/health) need no encoder of their own.
 video_session_bp = Blueprint('video_session', __name__)
 
 # Video duration mapping (milliseconds) - matches existing system
@@ -54,6 +74,7 @@ VIDEO_DURATIONS = {
     3: 160000,  # Video 3: 160 seconds (~2.7 minutes)
     4: 117000   # Video 4: 117 seconds (~2 minutes)
 }
+_VALID_VIDEOS = frozenset(VIDEO_DURATIONS)
 
 # Video valence/arousal mapping (from cal_physiological_diff.py)
 VIDEO_VALENCE_AROUSAL = {
@@ -67,8 +88,81 @@ VIDEO_VALENCE_AROUSAL = {
 _active_sessions: Dict[str, Dict[str, Any]] = {}
 _session_lock = threading.Lock()
 
+# Finished sessions stay visible to status polls for this long, then are evicted
+# lazily on the next lookup (no thread waits around to remove them)
+SESSION_RETENTION_SECONDS = 300
+_FINISHED_STATUSES = ('completed', 'error')
+
+
+def _session_expired(session: Dict[str, Any], now: float) -> bool:
+    return session['expires_at'] is not None and session['expires_at'] <= now
+
+
+def _evict_expired_sessions():
+    """Drop finished sessions past their retention; caller holds _session_lock."""
+    now = time.monotonic()
+    for session_id in [sid for sid, s in _active_sessions.items() if _session_expired(s, now)]:
+        del _active_sessions[session_id]
+        logger.info(f"Removed session: {session_id}")
+
+# video_id -> number of sessions currently in 'processing' (guarded by _session_lock)
+_processing_video_ids: Dict[int, int] = {}
+
+
+def _track_processing(video_id: int, delta: int):
+    """Adjust the processing refcount for video_id; caller holds _session_lock."""
+    count = _processing_video_ids.get(video_id, 0) + delta
+    if count > 0:
+        _processing_video_ids[video_id] = count
+    else:
+        _processing_video_ids.pop(video_id, None)
+
+# Per-user cluster assignments from video 1 profiling, persisted across restarts
+USER_CLUSTERS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "final", "user_clusters.pkl")
+
+
+def _load_user_clusters() -> Dict[str, int]:
+    """Load saved user -> cluster index assignments (empty if none saved yet)."""
+    try:
+        with open(USER_CLUSTERS_PATH, 'rb') as f:
+            return dict(pickle.load(f))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"⚠️  Could not load {USER_CLUSTERS_PATH}: {e}")
+        return {}
+
+
+def _save_user_clusters() -> bool:
+    """Write the current assignments atomically (temp file + rename); caller holds _user_clusters_lock."""
+    try:
+        os.makedirs(os.path.dirname(USER_CLUSTERS_PATH), exist_ok=True)
+        tmp_path = USER_CLUSTERS_PATH + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(dict(_user_cluster_indices), f)
+        os.replace(tmp_path, USER_CLUSTERS_PATH)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️  Could not save user clusters: {e}")
+        return False
+
+
+def _record_user_cluster(user_id: str, cluster_index: int):
+    """Store a successful profiling result and persist it."""
+    # Held across the save so concurrent sessions neither mutate the dict
+    # mid-pickle nor replace the file with an older snapshot
+    with _user_clusters_lock:
+        _user_cluster_indices[user_id] = cluster_index
+        if _save_user_clusters():
+            _profiled_users.add(user_id)
+
+
 # Global cluster index (set after first video for user profiling)
-_user_cluster_indices: Dict[str, int] = {}
+_user_cluster_indices: Dict[str, int] = _load_user_clusters()
+# Users whose profile was computed and saved; only these skip video 1 profiling
+_profiled_users = set(_user_cluster_indices)
+_user_clusters_lock = threading.Lock()
 
 
 class VideoSessionManager:
@@ -80,19 +174,29 @@ class VideoSessionManager:
     @staticmethod
     def create_session(video_id: int, timestamp: int, user_id: str, session_id: str) -> Dict[str, Any]:
         """Create a new video processing session."""
+        start_time = datetime.now()
         session_info = {
             'video_id': video_id,
             'timestamp': timestamp,
             'user_id': user_id,
             'session_id': session_id,
-            'start_time': datetime.now(),
+            'start_time': start_time,
+            'start_time_iso': start_time.isoformat(),  # formatted once for status polls
             'status': 'initializing',
-            'error': None
+            'error': None,
+            'expires_at': None  # set once the session finishes
         }
         
         with _session_lock:
+            _evict_expired_sessions()
+            previous = _active_sessions.get(session_id)
+            if previous is not None and previous['status'] == 'processing':
+                _track_processing(previous['video_id'], -1)
             _active_sessions[session_id] = session_info
         
+        # A new run for this video makes any cached timeline stale
+        invalidate_prefix(f"predvid:{video_id}:")
+        
         logger.info(f"Created session: {session_id} for video {video_id}")
         return session_info
     
@@ -100,154 +204,271 @@ class VideoSessionManager:
     def update_session_status(session_id: str, status: str, error: Optional[str] = None):
         """Update session status."""
         with _session_lock:
-            if session_id in _active_sessions:
-                _active_sessions[session_id]['status'] = status
+            session = _active_sessions.get(session_id)
+            if session is not None:
+                was_processing = session['status'] == 'processing'
+                if status == 'processing' and not was_processing:
+                    _track_processing(session['video_id'], 1)
+                elif was_processing and status != 'processing':
+                    _track_processing(session['video_id'], -1)
+                session['status'] = status
                 if error:
-                    _active_sessions[session_id]['error'] = error
+                    session['error'] = error
+                session['expires_at'] = (time.monotonic() + SESSION_RETENTION_SECONDS
+                                         if status in _FINISHED_STATUSES else None)
+        
+        # Cached timelines were bypassed while processing; refresh them once it ends
+        if session is not None and status != 'processing':
+            invalidate_prefix(f"predvid:{session['video_id']}:")
     
     @staticmethod
     def get_session(session_id: str) -> Optional[Dict[str, Any]]:
         """Get session information."""
         with _session_lock:
-            return _active_sessions.get(session_id)
+            session = _active_sessions.get(session_id)
+            if session is not None and _session_expired(session, time.monotonic()):
+                del _active_sessions[session_id]
+                logger.info(f"Removed session: {session_id}")
+                return None
+            return session
     
     @staticmethod
     def remove_session(session_id: str):
         """Remove session from active sessions."""
         with _session_lock:
-            if session_id in _active_sessions:
-                del _active_sessions[session_id]
+            session = _active_sessions.pop(session_id, None)
+            if session is not None:
+                if session['status'] == 'processing':
+                    _track_processing(session['video_id'], -1)
                 logger.info(f"Removed session: {session_id}")
     
     @staticmethod
     def is_video_processing(video_id: int) -> bool:
-        """Check if a video is currently being processed."""
-        with _session_lock:
-            for session in _active_sessions.values():
-                if session['video_id'] == video_id and session['status'] == 'processing':
-                    return True
-        return False
+        """
+        Check if a video is currently being processed.
+        O(1): reads the per-video refcount that create/update/remove_session
+        maintain, so no session scan or lock is needed on /api/video/start.
+        """
+        return _processing_video_ids.get(video_id, 0) > 0
+
+
+# signals_data.csv has no header: arduino millis, GSR, HR, epoch ms, datetime string
+SIGNAL_COLUMNS = ['Time_series', 'GSR', 'HR', 'timestamp', 'time2']
 
 
-def extract_signals_for_timeframe(start_time: int, end_time: int, video_id: int) -> pd.DataFrame:
+def _parse_signal_rows(data: bytes):
     """
-    Extract signals from signals_data.csv within the given timeframe.
-    Mirrors the logic from main.py lines 288-326.
+    Parse complete signals_data.csv lines into (rows, timestamps, gsr_hr).
+    rows keeps the raw 5 columns; timestamps is column 3 as int64 for range
+    lookups; gsr_hr is a contiguous float32 (n, 2) copy of GSR/HR for the
+    feature math (sensor readings are small integers, exact in float32).
+    """
+    if PYARROW_AVAILABLE:
+        return _parse_signal_rows_arrow(data)
+    signals = pd.read_csv(io.BytesIO(data), header=None, usecols=[0, 1, 2, 3, 4])
+    ts = signals[3].to_numpy(dtype=np.int64)
+    gsr_hr = np.ascontiguousarray(signals[[1, 2]].to_numpy(dtype=np.float32))
+    return signals.to_numpy(), ts, gsr_hr
+
+
+def _parse_signal_rows_arrow(data: bytes):
+    """pyarrow variant of _parse_signal_rows: columns are parsed in parallel and
+    timestamps/GSR/HR are taken straight from the Arrow buffers."""
+    table = pa_csv.read_csv(
+        pa.py_buffer(data),
+        read_options=pa_csv.ReadOptions(column_names=SIGNAL_COLUMNS),
+        convert_options=pa_csv.ConvertOptions(column_types={'time2': pa.string()})
+    )
+    columns = [col.to_numpy() for col in table.columns]
+    rows = np.empty((table.num_rows, len(columns)), dtype=object)
+    for i, col in enumerate(columns):
+        rows[:, i] = col
+    ts = columns[3].astype(np.int64)
+    gsr_hr = np.column_stack([columns[1], columns[2]]).astype(np.float32)
+    return rows, ts, gsr_hr
+
+
+# signals_data.csv is append-only while a session runs, so parsed rows are kept
+# in memory and only bytes appended since the last call are parsed.
+_signals_cache: Dict[str, Any] = {
+    'file': None,   # (path, inode) the buffer was built from
+    'offset': 0,    # bytes consumed (always at a line boundary)
+    'arr': np.empty((0, 5), dtype=object),
+    'ts': np.empty(0, dtype=np.int64),
+    'gsr_hr': np.empty((0, 2), dtype=np.float32),
+    'sorted': True  # timestamps non-decreasing, so ranges can be binary-searched
+}
+_signals_cache_lock = threading.Lock()
+
+
+def _load_signals(signals_path: str):
+    """
+    Return (rows, timestamps, gsr_hr, is_sorted) for everything in signals_data.csv,
+    parsing only the lines appended since the previous call. A trailing partial
+    line is left for the next call; a replaced or truncated file is re-read from
+    the start.
+    """
+    st = os.stat(signals_path)
+    with _signals_cache_lock:
+        cache = _signals_cache
+        file_id = (signals_path, st.st_ino)
+        if cache['file'] != file_id or st.st_size < cache['offset']:
+            cache.update(file=file_id, offset=0,
+                         arr=np.empty((0, 5), dtype=object),
+                         ts=np.empty(0, dtype=np.int64),
+                         gsr_hr=np.empty((0, 2), dtype=np.float32),
+                         sorted=True)
+        
+        if st.st_size > cache['offset']:
+            with open(signals_path, 'rb') as f:
+                f.seek(cache['offset'])
+                new_bytes = f.read()
+            complete = new_bytes.rfind(b'\n') + 1
+            if complete:
+                chunk = new_bytes[:complete]
+                if chunk.strip():
+                    PS, ts, gsr_hr = _parse_signal_rows(chunk)
+                    # Stays sorted if the new rows are ordered and continue from the old tail
+                    cache['sorted'] = bool(
+                        cache['sorted']
+                        and (len(cache['ts']) == 0 or ts[0] >= cache['ts'][-1])
+                        and np.all(ts[1:] >= ts[:-1])
+                    )
+                    cache['arr'] = np.concatenate([cache['arr'], PS])
+                    cache['ts'] = np.concatenate([cache['ts'], ts])
+                    cache['gsr_hr'] = np.concatenate([cache['gsr_hr'], gsr_hr])
+                cache['offset'] += complete
+        
+        return cache['arr'], cache['ts'], cache['gsr_hr'], cache['sorted']
+
+
+def _range_index(ts: np.ndarray, is_sorted: bool, t_lo: int, t_hi: int):
+    """
+    Index (slice or boolean mask) of rows with t_lo <= timestamp <= t_hi.
+    The collector appends in time order, so this is normally two binary
+    searches and a slice; out-of-order files fall back to a mask.
+    """
+    if is_sorted:
+        lo = int(np.searchsorted(ts, t_lo, side='left'))
+        hi = int(np.searchsorted(ts, t_hi, side='right'))
+        return slice(lo, hi)
+    return (ts >= t_lo) & (ts <= t_hi)
+
+
+_NO_SIGNALS = (pd.DataFrame(), np.empty((0, 2), dtype=np.float32))
+
+
+def _signals_frame(rows: np.ndarray, gsr_hr: np.ndarray, video_id: int) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Wrap selected signal rows in the named-column DataFrame the pipeline expects;
+    gsr_hr (the matching float32 GSR/HR rows) is passed through for the feature means.
+    """
+    if len(rows) == 0:
+        return _NO_SIGNALS
+    df = pd.DataFrame(rows, columns=SIGNAL_COLUMNS)
+    df["video_id"] = video_id
+    return df, gsr_hr
+
+
+def _extract_by_ts(t_lo: int, t_hi: int, video_id: int) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Rows of signals_data.csv with t_lo <= timestamp <= t_hi, tagged with video_id.
+    Both the window and the baseline extraction go through here and share the
+    cached parse from _load_signals.
+    Returns (signals DataFrame, GSR/HR float32 array).
     """
     signals_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "signals_data.csv")
     
     if not os.path.exists(signals_path):
         logger.error(f"❌ signals_data.csv not found at {signals_path}")
-        return pd.DataFrame()
+        return _NO_SIGNALS
     
     try:
-        signals = pd.read_csv(signals_path, header=None)
-        PS = np.asanyarray(signals)
-        
-        new_data = []
-        for j in range(len(PS)):
-            timestamp_value = int(PS[j, 3])
-            if start_time <= timestamp_value <= end_time:
-                new_data.append(PS[j])
-        
-        if not new_data:
-            return pd.DataFrame()
-        
-        new_df = pd.DataFrame(new_data)
-        new_df.rename(columns={
-            0: 'Time_series',
-            1: 'GSR',
-            2: 'HR',
-            3: 'timestamp',
-            4: 'time2'
-        }, inplace=True)
-        new_df["video_id"] = video_id
-        
-        return new_df
+        PS, ts, gsr_hr, is_sorted = _load_signals(signals_path)
+        idx = _range_index(ts, is_sorted, t_lo, t_hi)
+        return _signals_frame(PS[idx], gsr_hr[idx], video_id)
         
     except Exception as e:
         logger.error(f"Error extracting signals: {e}")
-        return pd.DataFrame()
+        return _NO_SIGNALS
+
+
+def extract_signals_for_timeframe(start_time: int, end_time: int,
+                                  video_id: int) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Extract signals from signals_data.csv within the given timeframe.
+    Mirrors the logic from main.py lines 288-326.
+    """
+    return _extract_by_ts(start_time, end_time, video_id)
 
 
-def extract_baseline_signals(baseline_start: int, baseline_end: int, video_id: int) -> pd.DataFrame:
+def extract_baseline_signals(baseline_start: int, baseline_end: int,
+                             video_id: int) -> Tuple[pd.DataFrame, np.ndarray]:
     """
     Extract baseline signals (5 seconds before video start).
-    Mirrors main.py lines 299-314.
+    Mirrors main.py lines 299-314, except that row 0 is no longer skipped:
+    signals_data.csv has no header row, so that skip was an off-by-one.
     """
-    signals_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "signals_data.csv")
-    
-    if not os.path.exists(signals_path):
-        return pd.DataFrame()
-    
+    return _extract_by_ts(baseline_start, baseline_end, video_id)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_first_score(score_path: str, mtime_ns: int, size: int) -> Optional[float]:
+    """Score column of the first data row; keyed on mtime/size so rewrites are re-read"""
+    with open(score_path) as f:
+        header = f.readline().rstrip('\n').split(',')
+        first = f.readline().rstrip('\n')
+    if not first:
+        return None
+    return float(first.split(',')[header.index('Score')])
+
+
+def read_window_score(score_path: str) -> Optional[float]:
+    """First change point score in score/<start_time>scores.csv, or None if missing/empty"""
     try:
-        signals = pd.read_csv(signals_path, header=None)
-        PS = np.asanyarray(signals)
-        
-        bs_data = []
-        for j in range(1, len(PS)):
-            timestamp_value = int(PS[j, 3])
-            if baseline_start <= timestamp_value <= baseline_end:
-                bs_data.append(PS[j])
-        
-        if not bs_data:
-            return pd.DataFrame()
-        
-        bs_df = pd.DataFrame(bs_data)
-        bs_df.rename(columns={
-            0: 'Time_series',
-            1: 'GSR',
-            2: 'HR',
-            3: 'timestamp',
-            4: 'time2'
-        }, inplace=True)
-        bs_df["video_id"] = video_id
-        
-        return bs_df
-        
-    except Exception as e:
-        logger.error(f"Error extracting baseline signals: {e}")
-        return pd.DataFrame()
+        st = os.stat(score_path)
+    except FileNotFoundError:
+        return None
+    return _read_first_score(score_path, st.st_mtime_ns, st.st_size)
+
 
+class FeatureRow(NamedTuple):
+    """One windowdata.csv row; field order is the CSV column order"""
+    Start_time: int
+    Score: float
+    GSR_diff: float
+    HR_diff: float
+    Previous_window: int
+    valence_acc_video: int
+    arousal_acc_video: int
+    video_id: int
 
-def compute_signal_diff(signal_df: pd.DataFrame, baseline_df: pd.DataFrame, 
-                        video_id: int, start_time: int, predictions: List[int]) -> Optional[pd.DataFrame]:
+
+def compute_signal_diff(signal_arr: np.ndarray, baseline_means: np.ndarray, 
+                        video_id: int, start_time: int, predictions: Deque[int]) -> Optional[FeatureRow]:
     """
     Compute physiological differences between current window and baseline.
     Mirrors cal_physiological_diff.py get_signal_diff logic.
-    Returns the feature row for this window.
+    signal_arr is the float32 (n, 2) GSR/HR array returned by extract_signals_for_timeframe;
+    baseline_means is the [GSR, HR] mean of the session baseline (computed once).
+    Returns the FeatureRow for this window.
     """
-    if signal_df.empty or baseline_df.empty:
+    if len(signal_arr) == 0:
         return None
     
     try:
-        # Calculate baseline means
-        bs_data = baseline_df[['GSR', 'HR']].values
-        GSR_meanblue = bs_data[:, 0].mean()
-        HR_meanblue = bs_data[:, 1].mean()
-        
-        # Get video-specific valence/arousal
-        valence, arousal = VIDEO_VALENCE_AROUSAL.get(video_id, (0, 0))
-        
-        # Filter signals for this video
-        video_signals = signal_df[signal_df['video_id'] == video_id]
-        if video_signals.empty:
-            return None
-        
-        data = video_signals[['GSR', 'HR']].values
         window_size = 50
         
-        if len(data) < window_size:
+        if len(signal_arr) < window_size:
             # Not enough data for a window
             return None
         
-        # Calculate differences for first window
-        x = data[:window_size, :]
-        xGSR_mean = x[:, 0].mean()
-        xHR_mean = x[:, 1].mean()
+        # Get video-specific valence/arousal
+        valence, arousal = VIDEO_VALENCE_AROUSAL.get(video_id, (0, 0))
         
-        GSR_diff = abs(GSR_meanblue - xGSR_mean)
-        HR_diff = abs(HR_meanblue - xHR_mean)
+        # Baseline means vs. first-window means, both columns at once
+        # (float32 storage, float64 accumulation)
+        GSR_diff, HR_diff = np.abs(baseline_means - signal_arr[:window_size].mean(axis=0, dtype=np.float64))
         
         # Previous window value
         prev_window = predictions[-1] if len(predictions) >= 1 else 2
@@ -259,48 +480,100 @@ def compute_signal_diff(signal_df: pd.DataFrame, baseline_df: pd.DataFrame,
             logger.warning(f"Score file not found: {score_path}")
             return None
         
-        scores = pd.read_csv(score_path)
-        if scores.empty:
+        score_value = read_window_score(score_path)
+        if score_value is None:
             return None
         
-        score_value = scores['Score'].iloc[0]
-        
         # Create feature row
-        feature_row = pd.DataFrame([{
-            'Start_time': start_time,
-            'Score': score_value,
-            'GSR_diff': GSR_diff,
-            'HR_diff': HR_diff,
-            'Previous_window': prev_window,
-            'valence_acc_video': valence,
-            'arousal_acc_video': arousal,
-            'video_id': video_id
-        }])
-        
-        return feature_row
+        return FeatureRow(
+            Start_time=int(start_time),
+            Score=float(score_value),
+            GSR_diff=float(GSR_diff),
+            HR_diff=float(HR_diff),
+            Previous_window=int(prev_window),
+            valence_acc_video=int(valence),
+            arousal_acc_video=int(arousal),
+            video_id=int(video_id)
+        )
         
     except Exception as e:
         logger.error(f"Error computing signal diff: {e}")
         return None
 
 
-def append_feature_to_windowdata(feature_row: pd.DataFrame):
-    """Append feature row to final/windowdata.csv"""
-    final_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "final")
-    os.makedirs(final_dir, exist_ok=True)
+# Model input columns taken from the rows preceding the current window
+MODEL_FEATURE_COLUMNS = ['Score', 'GSR_diff', 'HR_diff', 'Previous_window',
+                         'valence_acc_video', 'arousal_acc_video']
+
+WINDOWDATA_COLUMNS = list(FeatureRow._fields)
+
+
+class _WindowDataWriter:
+    """
+    Long-lived, line-buffered append handles for windowdata.csv.
+    Opened on first write and kept until close(), so each window costs one
+    write() instead of open+stat+close. Callers serialize through _windowdata_lock.
+    """
     
-    windowdata_path = os.path.join(final_dir, "windowdata.csv")
+    def __init__(self):
+        self._files: Dict[str, Any] = {}
     
-    header_needed = not os.path.exists(windowdata_path) or os.path.getsize(windowdata_path) == 0
+    def write(self, path: str, values):
+        f = self._files.get(path)
+        if f is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, 'a', buffering=1)
+            # Header check happens once per open (append mode starts at EOF),
+            # not once per window; no exists()/getsize() on the write path
+            if f.tell() == 0:
+                f.write(",".join(WINDOWDATA_COLUMNS) + "\n")
+            self._files[path] = f
+        f.write(",".join(map(str, values)) + "\n")
     
-    with open(windowdata_path, 'a') as f:
-        if header_needed:
-            f.write("Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-        
-        row = feature_row.iloc[0]
-        f.write(f"{int(row['Start_time'])},{row['Score']},{row['GSR_diff']},{row['HR_diff']},"
-                f"{int(row['Previous_window'])},{int(row['valence_acc_video'])},{int(row['arousal_acc_video'])},"
-                f"{int(row['video_id'])}\n")
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+_windowdata_writer = _WindowDataWriter()
+
+# Last rows appended to windowdata.csv by this process, in file order, so model
+# input can be sliced without re-reading the CSV
+_windowdata_tail: deque = deque(maxlen=16)
+_windowdata_lock = threading.Lock()
+
+
+def append_feature_to_windowdata(record: FeatureRow):
+    """Append a feature row (as returned by compute_signal_diff) to final/windowdata.csv"""
+    windowdata_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
+                                   "final", "windowdata.csv")
+    
+    # Lock keeps the file and the in-memory tail in the same row order
+    with _windowdata_lock:
+        _windowdata_writer.write(windowdata_path, record)
+        _windowdata_tail.append(record)
+
+
+def close_windowdata_writer():
+    """Flush and close the windowdata.csv handle (reopened on the next append)"""
+    with _windowdata_lock:
+        _windowdata_writer.close()
+
+
+def _model_input_from_tail(start_time: int) -> Optional[pd.DataFrame]:
+    """Model input from the in-memory tail, or None if it does not reach back far enough"""
+    with _windowdata_lock:
+        rows = list(_windowdata_tail)
+    
+    for current_index in range(len(rows) - 1, -1, -1):
+        if rows[current_index].Start_time == start_time:
+            if current_index < 3:
+                return None
+            # Fields 1..6 of FeatureRow are the MODEL_FEATURE_COLUMNS
+            return pd.DataFrame.from_records([r[1:7] for r in rows[current_index - 3:current_index]],
+                                             columns=MODEL_FEATURE_COLUMNS)
+    return None
 
 
 def get_model_input_from_windowdata(start_time: int) -> Optional[pd.DataFrame]:
@@ -308,6 +581,11 @@ def get_model_input_from_windowdata(start_time: int) -> Optional[pd.DataFrame]:
     Get the last 3 feature rows for LSTM input.
     Mirrors main.py lines 357-376.
     """
+    testX = _model_input_from_tail(start_time)
+    if testX is not None:
+        return testX
+    
+    # Cold start (rows written before this process started): fall back to the file
     windowdata_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
                                    "final", "windowdata.csv")
     
@@ -335,8 +613,7 @@ def get_model_input_from_windowdata(start_time: int) -> Optional[pd.DataFrame]:
         previous_rows = final_feature.iloc[current_index - 3: current_index]
         
         # Select the 6 features the model expects
-        testX = previous_rows[['Score', 'GSR_diff', 'HR_diff', 'Previous_window', 
-                               'valence_acc_video', 'arousal_acc_video']]
+        testX = previous_rows[MODEL_FEATURE_COLUMNS]
         
         return testX
         
@@ -345,11 +622,300 @@ def get_model_input_from_windowdata(start_time: int) -> Optional[pd.DataFrame]:
         return None
 
 
-def trigger_backend_pipeline(video_id: int, timestamp: int, user_id: str, session_id: str):
+# ============================================================================
+# PIPELINE SCHEDULING
+# ============================================================================
+
+# A single event loop thread schedules every session's windows, so a waiting
+# video costs a pending asyncio.sleep() rather than a sleeping OS thread. The
+# blocking pandas/TensorFlow work for each window is handed to a small thread
+# pool (threads, not processes, so the module-level signal/score/windowdata
+# caches stay shared).
+_pipeline_loop: Optional[asyncio.AbstractEventLoop] = None
+_pipeline_loop_lock = threading.Lock()
+# Bounds concurrent window processing however many sessions start at once;
+# extra windows queue on the executor
+PIPELINE_WORKERS = int(os.environ.get("SURJA_PIPELINE_WORKERS", "4"))
+_pipeline_executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix='VideoProcessor')
+
+
+def _shutdown_pipeline():
+    """Drop queued windows at interpreter exit instead of waiting for them."""
+    _pipeline_executor.shutdown(wait=False, cancel_futures=True)
+    if _pipeline_loop is not None:
+        _pipeline_loop.call_soon_threadsafe(_pipeline_loop.stop)
+
+
+atexit.register(_shutdown_pipeline)
+
+
+def _get_pipeline_loop() -> asyncio.AbstractEventLoop:
+    """Start the scheduler loop thread on first use and return its loop."""
+    global _pipeline_loop
+    with _pipeline_loop_lock:
+        if _pipeline_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True,
+                             name="PipelineScheduler").start()
+            _pipeline_loop = loop
+    return _pipeline_loop
+
+
+async def _blocking(func, *args):
+    """Run a blocking pipeline step on the worker pool without stalling the loop."""
+    return await asyncio.get_running_loop().run_in_executor(_pipeline_executor, func, *args)
+
+
+def _load_pipeline_modules():
+    """Import the heavy processing modules (TensorFlow, scikit-learn) off the loop thread."""
+    from cal_change_point import get_change_point_scores
+    from model_prediction import prepare_model_input
+    return get_change_point_scores, prepare_model_input
+
+
+# Windows that are ready at the same time (several live sessions, or one
+# catching up after a delay) share a single LSTM predict() call. Requests are
+# collected on the scheduler loop and flushed after PREDICTION_FLUSH_SECONDS or
+# once PREDICTION_MAX_BATCH are waiting. Only touched from the loop thread.
+PREDICTION_FLUSH_SECONDS = 0.2
+PREDICTION_MAX_BATCH = 8
+
+# (testX, cluster index, start_time, video_id, user_id, session_id, future)
+_pending_predictions: List[tuple] = []
+_prediction_flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+def _predict_batch(batch: List[tuple]) -> List[Any]:
     """
-    Trigger the full backend emotion analysis pipeline.
+    Blocking: run one predict() per cluster model over the stacked inputs, then
+    record each window's prediction. Returns a result or exception per item.
+    """
+    from model_prediction import predict_classes, record_prediction
+    
+    results: List[Any] = [None] * len(batch)
+    by_cluster: Dict[int, List[int]] = {}
+    for i, item in enumerate(batch):
+        by_cluster.setdefault(item[1], []).append(i)
     
-    This function ports the complete logic from main.py, including:
+    for cluster, indices in by_cluster.items():
+        try:
+            classes = predict_classes(cluster, np.concatenate([batch[i][0] for i in indices]))
+        except Exception as e:
+            for i in indices:
+                results[i] = e
+            continue
+        
+        offset = 0
+        for i in indices:
+            testX, _, start_time, video_id, user_id, session_id, _ = batch[i]
+            n = len(testX)
+            try:
+                results[i] = record_prediction(classes[offset:offset + n], cluster,
+                                               start_time, video_id,
+                                               user_id, session_id).item()
+            except Exception as e:
+                results[i] = e
+            offset += n
+    return results
+
+
+async def _run_prediction_batch(batch: List[tuple]):
+    try:
+        results = await _blocking(_predict_batch, batch)
+    except Exception as e:
+        results = [e] * len(batch)
+    for item, result in zip(batch, results):
+        future = item[-1]
+        if future.done():
+            continue
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+
+def _flush_predictions():
+    """Hand every pending prediction request to the worker pool as one batch."""
+    global _prediction_flush_handle
+    if _prediction_flush_handle is not None:
+        _prediction_flush_handle.cancel()
+        _prediction_flush_handle = None
+    if not _pending_predictions:
+        return
+    batch = list(_pending_predictions)
+    _pending_predictions.clear()
+    asyncio.get_running_loop().create_task(_run_prediction_batch(batch))
+
+
+async def _predict(testX: np.ndarray, nearest_centroid_index: int, start_time: int,
+                   video_id: int, user_id: str, session_id: str) -> int:
+    """Queue one window for batched prediction and wait for its class."""
+    global _prediction_flush_handle
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _pending_predictions.append((testX, nearest_centroid_index, start_time,
+                                 video_id, user_id, session_id, future))
+    if len(_pending_predictions) >= PREDICTION_MAX_BATCH:
+        _flush_predictions()
+    elif _prediction_flush_handle is None:
+        _prediction_flush_handle = loop.call_later(PREDICTION_FLUSH_SECONDS, _flush_predictions)
+    return await future
+
+
+# The test/online_<ts>.csv and test/bs_data.csv copies are debug artifacts;
+# the pipeline works from the in-memory frames, so they are only written
+# when SURJA_DEBUG_DUMP is set.
+DEBUG_DUMP = bool(os.getenv('SURJA_DEBUG_DUMP'))
+
+
+def _debug_dump(df: pd.DataFrame, filename: str):
+    """Write df to test/<filename> when SURJA_DEBUG_DUMP is enabled."""
+    if not DEBUG_DUMP:
+        return
+    test_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test")
+    os.makedirs(test_dir, exist_ok=True)
+    df.to_csv(os.path.join(test_dir, filename), index=False)
+
+
+def _prepare_baseline(video_id: int, baseline_start: int, baseline_end: int) -> Optional[np.ndarray]:
+    """
+    Extract the session baseline once (it is the same for every window) and
+    return its [GSR, HR] means, or None if empty.
+    """
+    baseline_df, baseline_arr = extract_baseline_signals(baseline_start, baseline_end, video_id)
+    if baseline_df.empty:
+        return None
+    
+    _debug_dump(baseline_df, "bs_data.csv")
+    
+    return baseline_arr.mean(axis=0, dtype=np.float64)
+
+
+def _profile_user(video_id: int, timestamp: int, actual_end_time: int, user_id: str,
+                  session_id: str, get_change_point_scores) -> None:
+    """Video 1: score the whole video and assign the user's cluster (blocking)."""
+    # Extract signals for the full video
+    signals_df, _ = extract_signals_for_timeframe(timestamp, actual_end_time, video_id)
+    
+    if signals_df.empty:
+        logger.warning(f"⚠️  No signals found for video {video_id}")
+        VideoSessionManager.update_session_status(session_id, 'completed',
+                                                 'No signals found for user profiling')
+        return
+    
+    logger.info(f"✅ Extracted {len(signals_df)} signals for user profiling")
+    
+    _debug_dump(signals_df, f"online_{timestamp}.csv")
+    
+    # Calculate change point scores
+    logger.info("🔍 Calculating change point scores for profiling...")
+    get_change_point_scores(signals_df, timestamp, window_size=50)
+    
+    # Load scores
+    score_path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                              "score", f"{timestamp}scores.csv")
+    if not os.path.exists(score_path):
+        logger.error(f"❌ Score file not found: {score_path}")
+        VideoSessionManager.update_session_status(session_id, 'error',
+                                                 'Failed to generate change scores')
+        return
+    
+    score_df = pd.read_csv(score_path)
+    
+    if score_df.empty:
+        logger.warning("⚠️  Empty score dataframe for profiling")
+        VideoSessionManager.update_session_status(session_id, 'completed',
+                                                 'No scores generated for profiling')
+        return
+    
+    # Do user profiling
+    try:
+        from profile_cluster_creation import do_cluster_newdata, do_new_user_label, nearest_cluster_allocation
+        
+        valence_arousal_vectors = do_cluster_newdata(score_df, "Score")
+        new_vector = do_new_user_label(valence_arousal_vectors)
+        nearest_centroid_index = nearest_cluster_allocation(new_vector)
+        
+        _record_user_cluster(user_id, nearest_centroid_index)
+        logger.info(f"👤 User {user_id} assigned to cluster {nearest_centroid_index}")
+    
+    except Exception as profile_error:
+        # Not recorded: later sessions fall back to cluster 0 and video 1 retries profiling
+        logger.warning(f"⚠️  Profiling failed: {profile_error}, using default cluster 0")
+    
+    VideoSessionManager.update_session_status(session_id, 'completed')
+    logger.info(f"✅ Video 1 profiling completed for user {user_id}")
+
+
+def _process_window(video_id: int, window_start: int, window_end: int, actual_end_time: int,
+                    baseline_means: np.ndarray, predictions: Deque[int],
+                    get_change_point_scores, prepare_model_input) -> Optional[np.ndarray]:
+    """
+    Blocking work for one 5-second window: signals, change scores, features.
+    Returns the LSTM input for the window, or None if the window was skipped;
+    the prediction itself is batched by _predict.
+    """
+    # Clear active predictions near video end
+    if window_start >= (actual_end_time - 20000):
+        if DB_AVAILABLE:
+            try:
+                clear_active_predictions(video_id)
+                logger.info(f"🗑️  Cleared active predictions for video {video_id}")
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to clear predictions: {e}")
+    
+    # Extract signals for this window
+    signals_df, signal_arr = extract_signals_for_timeframe(window_start, window_end, video_id)
+    
+    if signals_df.empty:
+        logger.warning(f"⚠️  No signals for window {window_start}")
+        return None
+    
+    _debug_dump(signals_df, f"online_{window_start}.csv")
+    
+    # Calculate change point scores
+    logger.debug(f"🔍 Calculating change scores for window {window_start}")
+    get_change_point_scores(signals_df, window_start, window_size=50)
+    
+    # Check if score file was created
+    score_path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                              "score", f"{window_start}scores.csv")
+    if not os.path.exists(score_path):
+        logger.warning(f"⚠️  Score file not created for window {window_start}")
+        return None
+    
+    # Parsed once here; compute_signal_diff below reuses the cached value
+    if read_window_score(score_path) is None:
+        logger.warning(f"⚠️  Empty scores for window {window_start}")
+        return None
+    
+    # Compute physiological differences and create feature row
+    feature_row = compute_signal_diff(signal_arr, baseline_means, video_id,
+                                      window_start, predictions)
+    
+    if feature_row is None:
+        logger.warning(f"⚠️  Could not compute features for window {window_start}")
+        return None
+    
+    # Append to windowdata.csv
+    append_feature_to_windowdata(feature_row)
+    
+    # Get model input (needs 3 previous rows)
+    testX = get_model_input_from_windowdata(window_start)
+    
+    if testX is None or len(testX) < 3:
+        logger.debug(f"⏳ Not enough history for prediction at {window_start}")
+        return None
+    
+    return prepare_model_input(testX)
+
+
+async def run_backend_pipeline(video_id: int, timestamp: int, user_id: str, session_id: str,
+                               force_refresh: bool = False):
+    """
+    Run the full backend emotion analysis pipeline for one session.
+    
+    This coroutine ports the complete logic from main.py, including:
     1. Signal extraction from signals_data.csv
     2. Baseline extraction (5 seconds before video start)
     3. Change point score calculation
@@ -357,19 +923,22 @@ def trigger_backend_pipeline(video_id: int, timestamp: int, user_id: str, sessio
     5. Feature generation
     6. LSTM model prediction
     
+    Waits are asyncio sleeps on the scheduler loop; each window's processing
+    runs on the worker pool.
+    
     Args:
         video_id: Video identifier (1-4)
         timestamp: Video start timestamp (milliseconds)
         user_id: User identifier
         session_id: Unique session identifier
+        force_refresh: Re-run video 1 profiling even if the user already has a saved cluster
     """
     try:
         logger.info(f"🎬 Starting backend pipeline for video {video_id} (session: {session_id})")
         VideoSessionManager.update_session_status(session_id, 'processing')
         
         # Import processing modules
-        from cal_change_point import get_change_point_scores
-        from model_prediction import get_model_prediction
+        get_change_point_scores, prepare_model_input = await _blocking(_load_pipeline_modules)
         
         # Calculate timing
         duration_ms = VIDEO_DURATIONS.get(video_id, 150000)
@@ -380,77 +949,37 @@ def trigger_backend_pipeline(video_id: int, timestamp: int, user_id: str, sessio
         logger.info(f"📊 Video {video_id}: duration={duration_ms}ms, start={timestamp}, end={actual_end_time}")
         
         # Get or initialize user's cluster index
-        global _user_cluster_indices
         nearest_centroid_index = _user_cluster_indices.get(user_id, 0)
         
         # For video 1, we need to do user profiling first
         if video_id == 1:
-            logger.info("⏳ Video 1: Waiting full duration for user profiling...")
-            time.sleep(duration_ms / 1000)
-            
-            # Extract signals for the full video
-            signals_df = extract_signals_for_timeframe(timestamp, actual_end_time, video_id)
-            
-            if signals_df.empty:
-                logger.warning(f"⚠️  No signals found for video {video_id}")
-                VideoSessionManager.update_session_status(session_id, 'completed', 
-                                                         'No signals found for user profiling')
+            if user_id in _profiled_users and not force_refresh:
+                logger.info(f"👤 User {user_id} already profiled (cluster {nearest_centroid_index}), "
+                            f"skipping video 1 profiling")
+                VideoSessionManager.update_session_status(session_id, 'completed')
                 return
             
-            logger.info(f"✅ Extracted {len(signals_df)} signals for user profiling")
-            
-            # Save signals for processing
-            test_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test")
-            os.makedirs(test_dir, exist_ok=True)
-            signals_df.to_csv(os.path.join(test_dir, f"online_{timestamp}.csv"), index=False)
-            
-            # Calculate change point scores
-            logger.info("🔍 Calculating change point scores for profiling...")
-            get_change_point_scores(signals_df, timestamp, window_size=50)
-            
-            # Load scores
-            score_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                      "score", f"{timestamp}scores.csv")
-            if not os.path.exists(score_path):
-                logger.error(f"❌ Score file not found: {score_path}")
-                VideoSessionManager.update_session_status(session_id, 'error', 
-                                                         'Failed to generate change scores')
-                return
-            
-            score_df = pd.read_csv(score_path)
-            
-            if score_df.empty:
-                logger.warning("⚠️  Empty score dataframe for profiling")
-                VideoSessionManager.update_session_status(session_id, 'completed', 
-                                                         'No scores generated for profiling')
-                return
-            
-            # Do user profiling
-            try:
-                from profile_cluster_creation import do_cluster_newdata, do_new_user_label, nearest_cluster_allocation
-                
-                valence_arousal_vectors = do_cluster_newdata(score_df, "Score")
-                new_vector = do_new_user_label(valence_arousal_vectors)
-                nearest_centroid_index = nearest_cluster_allocation(new_vector)
-                
-                _user_cluster_indices[user_id] = nearest_centroid_index
-                logger.info(f"👤 User {user_id} assigned to cluster {nearest_centroid_index}")
-                
-            except Exception as profile_error:
-                logger.warning(f"⚠️  Profiling failed: {profile_error}, using default cluster 0")
-                nearest_centroid_index = 0
-                _user_cluster_indices[user_id] = 0
-            
-            VideoSessionManager.update_session_status(session_id, 'completed')
-            logger.info(f"✅ Video 1 profiling completed for user {user_id}")
+            logger.info("⏳ Video 1: Waiting full duration for user profiling...")
+            await asyncio.sleep(duration_ms / 1000)
+            await _blocking(_profile_user, video_id, timestamp, actual_end_time,
+                            user_id, session_id, get_change_point_scores)
             return
         
         # For videos 2-4: Wait initial period then process in windows
         logger.info(f"⏳ Waiting 15 seconds for initial signal collection...")
-        time.sleep(15)
+        await asyncio.sleep(15)
+        
+        # Baseline (5 s before video start) is already recorded and identical for every window
+        baseline_means = await _blocking(_prepare_baseline, video_id, baseline_start, baseline_end)
+        if baseline_means is None:
+            logger.warning(f"⚠️  No baseline signals for video {video_id}")
+            VideoSessionManager.update_session_status(session_id, 'completed',
+                                                     'No baseline signals found')
+            return
         
         # Initialize prediction history
-        predictions = [3, 2]  # Initial values from main.py
+        # Initial values from main.py; only the latest prediction is read back
+        predictions: Deque[int] = deque([3, 2], maxlen=4)
         prediction_count = 0
         
         # Process in 5-second windows
@@ -462,95 +991,120 @@ def trigger_backend_pipeline(video_id: int, timestamp: int, user_id: str, sessio
             if window_end > current_time_ms:
                 wait_time = (window_end - current_time_ms) / 1000
                 logger.debug(f"⏳ Waiting {wait_time:.1f}s for window {window_start}")
-                time.sleep(max(0, wait_time))
-            
-            # Clear active predictions near video end
-            if window_start >= (actual_end_time - 20000):
-                if DB_AVAILABLE:
-                    try:
-                        clear_active_predictions(video_id)
-                        logger.info(f"🗑️  Cleared active predictions for video {video_id}")
-                    except Exception as e:
-                        logger.warning(f"⚠️  Failed to clear predictions: {e}")
-            
-            # Extract signals for this window
-            signals_df = extract_signals_for_timeframe(window_start, window_end, video_id)
-            
-            if signals_df.empty:
-                logger.warning(f"⚠️  No signals for window {window_start}")
-                continue
-            
-            # Extract baseline signals
-            baseline_df = extract_baseline_signals(baseline_start, baseline_end, video_id)
-            
-            if baseline_df.empty:
-                logger.warning(f"⚠️  No baseline signals for window {window_start}")
-                continue
-            
-            # Save signals
-            test_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "test")
-            os.makedirs(test_dir, exist_ok=True)
-            signals_df.to_csv(os.path.join(test_dir, f"online_{window_start}.csv"), index=False)
-            baseline_df.to_csv(os.path.join(test_dir, "bs_data.csv"), index=False)
-            
-            # Calculate change point scores
-            logger.debug(f"🔍 Calculating change scores for window {window_start}")
-            get_change_point_scores(signals_df, window_start, window_size=50)
-            
-            # Check if score file was created
-            score_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                      "score", f"{window_start}scores.csv")
-            if not os.path.exists(score_path):
-                logger.warning(f"⚠️  Score file not created for window {window_start}")
-                continue
-            
-            score_df = pd.read_csv(score_path)
-            if score_df.empty:
-                logger.warning(f"⚠️  Empty scores for window {window_start}")
-                continue
-            
-            # Compute physiological differences and create feature row
-            feature_row = compute_signal_diff(signals_df, baseline_df, video_id, 
-                                              window_start, predictions)
-            
-            if feature_row is None:
-                logger.warning(f"⚠️  Could not compute features for window {window_start}")
-                continue
-            
-            # Append to windowdata.csv
-            append_feature_to_windowdata(feature_row)
-            
-            # Get model input (needs 3 previous rows)
-            testX = get_model_input_from_windowdata(window_start)
+                await asyncio.sleep(max(0, wait_time))
             
-            if testX is None or len(testX) < 3:
-                logger.debug(f"⏳ Not enough history for prediction at {window_start}")
+            testX = await _blocking(
+                _process_window, video_id, window_start, window_end, actual_end_time,
+                baseline_means, predictions, get_change_point_scores, prepare_model_input
+            )
+            if testX is None:
                 continue
             
             # Make prediction
             try:
-                y_pred_class = get_model_prediction(testX, nearest_centroid_index, 
-                                                    window_start, video_id, 
-                                                    user_id, session_id)
-                predictions.append(y_pred_class.item())
-                prediction_count += 1
-                logger.info(f"✅ Prediction {prediction_count} generated for window {window_start}")
-                
+                prediction = await _predict(testX, nearest_centroid_index, window_start,
+                                            video_id, user_id, session_id)
             except Exception as pred_error:
                 logger.error(f"❌ Prediction error at {window_start}: {pred_error}")
                 continue
+            
+            predictions.append(prediction)
+            prediction_count += 1
+            logger.info(f"✅ Prediction {prediction_count} generated for window {window_start}")
         
         logger.info(f"🎉 Completed processing: {prediction_count} predictions generated for video {video_id}")
         VideoSessionManager.update_session_status(session_id, 'completed')
-        
+    
     except Exception as e:
         logger.error(f"❌ Pipeline error for session {session_id}: {e}", exc_info=True)
         VideoSessionManager.update_session_status(session_id, 'error', str(e))
     
     finally:
-        # Cleanup: Remove session after some time
-        time.sleep(300)  # Keep session info for 5 minutes
-        VideoSessionManager.remove_session(session_id)
+        # Release the windowdata.csv handle; a concurrent session simply reopens it
+        close_windowdata_writer()
+
+
+def trigger_backend_pipeline(video_id: int, timestamp: int, user_id: str, session_id: str,
+                             force_refresh: bool = False):
+    """
+    Schedule run_backend_pipeline on the pipeline event loop and return immediately.
+    Returns a concurrent.futures.Future for the session's pipeline.
+    """
+    return asyncio.run_coroutine_threadsafe(
+        run_backend_pipeline(video_id, timestamp, user_id, session_id, force_refresh),
+        _get_pipeline_loop()
+    )
+
+
+# ============================================================================
+# VIDEO START RECORDING
+# ============================================================================
+
+# /api/video/start only enqueues the video_starts document; one writer thread
+# drains the queue and inserts whatever arrived within VIDEO_START_FLUSH_SECONDS
+# (up to VIDEO_START_MAX_BATCH) with a single insert_many.
+VIDEO_START_FLUSH_SECONDS = 0.1
+VIDEO_START_MAX_BATCH = 500
+_video_start_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_video_start_writer: Optional[threading.Thread] = None
+_video_start_writer_lock = threading.Lock()
+
+
+def _drain_video_starts(first: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collect first plus whatever else arrives before the flush deadline."""
+    batch = [first]
+    deadline = time.monotonic() + VIDEO_START_FLUSH_SECONDS
+    while len(batch) < VIDEO_START_MAX_BATCH:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_video_start_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _video_start_writer_loop():
+    while True:
+        batch = _drain_video_starts(_video_start_queue.get())
+        try:
+            insert_video_starts_bulk(batch)
+        except Exception as db_error:
+            logger.error(f"⚠️  Database insert failed for {len(batch)} video start(s): {db_error}")
+
+
+def record_video_start(timestamp: int, video_id: int, user_id: str, session_id: str):
+    """Queue a video_starts document for the background writer (no DB round-trip)."""
+    global _video_start_writer
+    if _video_start_writer is None:
+        with _video_start_writer_lock:
+            if _video_start_writer is None:
+                _video_start_writer = threading.Thread(target=_video_start_writer_loop,
+                                                       daemon=True, name="VideoStartWriter")
+                _video_start_writer.start()
+    _video_start_queue.put_nowait({
+        'timestamp': timestamp,
+        'video_id': video_id,
+        'user_id': user_id,
+        'session_id': session_id,
+        'created_at': datetime.now()
+    })
+
+
+def _flush_video_starts():
+    """Write anything still queued at interpreter exit."""
+    pending = []
+    while True:
+        try:
+            pending.append(_video_start_queue.get_nowait())
+        except queue.Empty:
+            break
+    if pending and DB_AVAILABLE:
+        insert_video_starts_bulk(pending)
+
+
+atexit.register(_flush_video_starts)
 
 
 # ============================================================================
@@ -563,10 +1117,11 @@ def start_video_processing():
     API endpoint: Start video processing
     
     Called by frontend when user starts playing a video.
-    Triggers the emotion analysis pipeline in a background thread.
+    Schedules the emotion analysis pipeline on the background pipeline loop.
     """
     try:
-        data = request.get_json()
+        # Malformed bodies and wrong content types fall through to the 400 below
+        data = request.get_json(silent=True)
         
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
@@ -575,13 +1130,16 @@ def start_video_processing():
         timestamp = data.get('timestamp', int(time.time() * 1000))
         user_id = data.get('user_id', 'anonymous')
         session_id = data.get('session_id', f"{user_id}_{video_id}_{timestamp}")
+        # Re-run video 1 profiling for a user who already has a saved cluster
+        force_refresh = (bool(data.get('force_refresh', False))
+                         or request.args.get('force_refresh', '').lower() in ('1', 'true'))
         
         if not video_id:
             return jsonify({'error': 'video_id is required'}), 400
         
-        if video_id not in VIDEO_DURATIONS:
+        if video_id not in _VALID_VIDEOS:
             return jsonify({
-                'error': f'Invalid video_id. Must be one of: {list(VIDEO_DURATIONS.keys())}'
+                'error': f'Invalid video_id. Must be one of: {sorted(_VALID_VIDEOS)}'
             }), 400
         
         if VideoSessionManager.is_video_processing(video_id):
@@ -593,21 +1151,11 @@ def start_video_processing():
         VideoSessionManager.create_session(video_id, timestamp, user_id, session_id)
         
         if DB_AVAILABLE:
-            try:
-                insert_video_start(timestamp, video_id, user_id, session_id)
-                logger.info(f"📊 Recorded video start: video={video_id}, user={user_id}")
-            except Exception as db_error:
-                logger.error(f"⚠️  Database insert failed: {db_error}")
-        
-        processing_thread = threading.Thread(
-            target=trigger_backend_pipeline,
-            args=(video_id, timestamp, user_id, session_id),
-            daemon=True,
-            name=f"VideoProcessor-{session_id}"
-        )
-        processing_thread.start()
+            record_video_start(timestamp, video_id, user_id, session_id)
+        
+        trigger_backend_pipeline(video_id, timestamp, user_id, session_id, force_refresh)
         
-        logger.info(f"✅ Started processing thread for session {session_id}")
+        logger.info(f"✅ Scheduled processing pipeline for session {session_id}")
         
         return jsonify({
             'status': 'success',
@@ -627,7 +1175,8 @@ def start_video_processing():
 def stop_video_processing():
     """API endpoint: Stop video processing (optional)"""
     try:
-        data = request.get_json()
+        # Malformed bodies and wrong content types fall through to the 400 below
+        data = request.get_json(silent=True)
         
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
@@ -641,6 +1190,9 @@ def stop_video_processing():
                 VideoSessionManager.update_session_status(session_id, 'stopped')
                 logger.info(f"🛑 Session {session_id} marked as stopped")
         
+        invalidate_prefix(f"predvid:{video_id}:" if video_id else "predvid:")
+        invalidate_prefix("summary")
+        
         return jsonify({
             'status': 'success',
             'message': 'Stop signal received'
@@ -665,24 +1217,29 @@ def get_session_status(session_id: str):
         'user_id': session['user_id'],
         'status': session['status'],
         'error': session.get('error'),
-        'started_at': session['start_time'].isoformat()
+        'started_at': session['start_time_iso']
     }), 200
 
 
 @video_session_bp.route('/api/video/sessions/active', methods=['GET'])
 def get_active_sessions():
     """API endpoint: Get all active sessions"""
+    # Only the snapshot is taken under the lock; writers are not held up while
+    # the response is built and encoded
     with _session_lock:
-        sessions = []
-        for session_id, session in _active_sessions.items():
-            sessions.append({
-                'session_id': session_id,
-                'video_id': session['video_id'],
-                'user_id': session['user_id'],
-                'status': session['status'],
-                'error': session.get('error'),
-                'started_at': session['start_time'].isoformat()
-            })
+        _evict_expired_sessions()
+        snapshot = list(_active_sessions.items())
+    
+    sessions = []
+    for session_id, session in snapshot:
+        sessions.append({
+            'session_id': session_id,
+            'video_id': session['video_id'],
+            'user_id': session['user_id'],
+            'status': session['status'],
+            'error': session.get('error'),
+            'started_at': session['start_time_iso']
+        })
     
     return jsonify({
         'active_sessions': sessions,
@@ -690,12 +1247,18 @@ def get_active_sessions():
     }), 200
 
 
+def _live_session_count() -> int:
+    with _session_lock:
+        _evict_expired_sessions()
+        return len(_active_sessions)
+
+
 @video_session_bp.route('/api/video/health', methods=['GET'])
 def health_check():
     """API endpoint: Health check"""
     return jsonify({
         'status': 'healthy',
         'service': 'video_session_manager',
-        'timestamp': datetime.now().isoformat(),
-        'active_sessions': len(_active_sessions)
+        'timestamp': datetime.now(),
+        'active_sessions': _live_session_count()
     }), 200
@@ -1,78 +1,191 @@
-from collections import Counter
-from centralized_baseline import is_change_present
-from densratio import densratio
-import glob
-import math
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import os
 import numpy as np
-from natsort import natsorted, ns
-import pandas as pd
-
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
 
 # MongoDB integration - dual write (CSV + DB)
 try:
-    from db_models import insert_change_score
+    from db_models import insert_change_scores_bulk
     DB_ENABLED = True
 except ImportError as e:
     DB_ENABLED = False
     print(f"⚠️  MongoDB not available for change scores: {e}")
-def get_change_point_scores(filename, start_time, window_size=50):
-    original_data = filename
 
-    # print(original_data.columns)
-    # print("score_cal",original_data)
 
-    # if(video_id!=-1):
-    # filter_data = original_data['video']==video_id
-    # original_data = original_data [filter_data]
+# RuLSIF (relative unconstrained least-squares importance fitting), the method
+# densratio(x, y, alpha) runs, evaluated for every window pair at once.
+# Transcribes densratio 0.3.0 (the pinned version the LSTM models were trained
+# against): its "auto" sigma/lambda grid, 10 ** linspace(-3, 9, 13), and its
+# leave-one-out CV score as written. The one difference is that the kernel
+# centers are all numerator samples (W <= densratio's 100-center cap) instead
+# of a random draw, so scores are deterministic.
+# scripts/check_rulsif_equivalence.py compares against the installed densratio.
+RULSIF_SIGMA_RANGE = 10 ** np.linspace(-3, 9, 13)
+RULSIF_LAMBDA_RANGE = 10 ** np.linspace(-3, 9, 13)
+
+# Opt-in fast path: fix the kernel width with the median heuristic over the
+# whole series and cross-validate lambda only (one kernel evaluation per
+# problem instead of nine). Off by default because the LSTM models were
+# trained on scores with the CV-selected width.
+RULSIF_MEDIAN_WIDTH = bool(os.getenv('SURJA_RULSIF_MEDIAN_WIDTH'))
+
+# Long recordings (video 1 profiling) are split into chunks of problems scored
+# on a thread pool; NumPy's exp/matmul/inv release the GIL, so chunks run on
+# separate cores without pickling windows to worker processes.
+RULSIF_CHUNK = 64
+_rulsif_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                  thread_name_prefix='RuLSIF')
+
+
+def _sq_dists(a, b):
+    # Pairwise squared distances per batch item: (m, na, d), (m, nb, d) -> (m, na, nb)
+    return ((a[:, :, None, :] - b[:, None, :, :]) ** 2).sum(axis=-1)
+
+
+def median_kernel_width(data, max_points=1000):
+    """Median pairwise distance of the series (evenly subsampled), or None if degenerate."""
+    data = np.asarray(data, dtype=np.float64)
+    sample = data[::max(1, len(data) // max_points)]
+    d = _sq_dists(sample[None], sample[None])[0]
+    d = d[np.triu_indices(len(sample), k=1)]
+    d = d[d > 0]
+    if len(d) == 0:
+        return None
+    return float(np.sqrt(np.median(d)))
+
+
+def _rulsif_alpha_pe(d_nu, d_de, alpha, sigma_range=RULSIF_SIGMA_RANGE):
+    """
+    alpha-relative PE divergence for a batch of problems.
+    d_nu: (m, n_nu, k) squared distances from numerator samples to the centers
+    d_de: (m, n_de, k) squared distances from denominator samples to the centers
+    Returns (m,) divergences, as densratio(x_nu, x_de, alpha).alpha_PE would.
+    """
+    m, n_nu, k = d_nu.shape
+    n_de = d_de.shape[1]
+    n_min = min(n_nu, n_de)
+    eye = np.eye(k)
+
+    best_score = np.full(m, np.inf)
+    best_sigma = np.full(m, sigma_range[0])
+    best_lambda = np.full(m, RULSIF_LAMBDA_RANGE[0])
+
+    # Leave-one-out CV over the (sigma, lambda) grid, all problems at once
+    for sigma in sigma_range:
+        phi_nu = np.exp(-d_nu / (2 * sigma ** 2))
+        phi_de = np.exp(-d_de / (2 * sigma ** 2))
+        H = (alpha * (phi_nu.transpose(0, 2, 1) @ phi_nu) / n_nu
+             + (1 - alpha) * (phi_de.transpose(0, 2, 1) @ phi_de) / n_de)
+        h = phi_nu.mean(axis=1)
+        P_nu = phi_nu[:, :n_min].transpose(0, 2, 1)
+        P_de = phi_de[:, :n_min].transpose(0, 2, 1)
 
-    # print('directory:{},filename:{}'.format(directory, filename))
+        for lambda_ in RULSIF_LAMBDA_RANGE:
+            B_inv = np.linalg.inv(H + eye * (lambda_ * (n_de - 1) / n_de))
+            B_inv_X = B_inv @ P_de
+            denom = n_de - (P_de * B_inv_X).sum(axis=1)
+            B0 = (B_inv @ h[:, :, None]
+                  + B_inv_X * (np.einsum('mk,mkn->mn', h, B_inv_X) / denom)[:, None, :])
+            # densratio 0.3.0 leaves this correction undivided by denom (unlike B0);
+            # kept as-is so the selected sigma/lambda match the training-time scores
+            B1 = B_inv @ P_nu + B_inv_X * (P_nu * B_inv_X).sum(axis=1)[:, None, :]
+            B2 = np.maximum((n_de - 1) * (n_nu * B0 - B1) / (n_de * (n_nu - 1)), 0)
+            r_de = (P_de * B2).sum(axis=1)
+            r_nu = (P_nu * B2).sum(axis=1)
+            score = ((r_de ** 2).sum(axis=1) / 2 - r_nu.sum(axis=1)) / n_min
 
-    # data = original_data[['value_EDA','value_TEMP','value_HR']]
-    data = original_data[['GSR', 'HR']]
-    # print('data:{}'.format(data))
-    data = np.asanyarray(data)
-    # print(data.shape)
-    # out_file = open(directory+filename.split("/")[len(filename.split("/"))-1].split(".")[0]+"_scores.csv","w+")
+            better = score < best_score
+            best_score[better] = score[better]
+            best_sigma[better] = sigma
+            best_lambda[better] = lambda_
+
+    # Final fit with each problem's selected parameters
+    width = (2 * best_sigma ** 2)[:, None, None]
+    phi_nu = np.exp(-d_nu / width)
+    phi_de = np.exp(-d_de / width)
+    H = (alpha * (phi_nu.transpose(0, 2, 1) @ phi_nu) / n_nu
+         + (1 - alpha) * (phi_de.transpose(0, 2, 1) @ phi_de) / n_de)
+    h = phi_nu.mean(axis=1)
+    theta = np.linalg.solve(H + eye * best_lambda[:, None, None], h[:, :, None])[:, :, 0]
+    theta = np.maximum(theta, 0)
+
+    g_nu = np.einsum('mnk,mk->mn', phi_nu, theta)
+    g_de = np.einsum('mnk,mk->mn', phi_de, theta)
+    return ((-alpha * (g_nu ** 2).sum(axis=1) / 2
+             - (1 - alpha) * (g_de ** 2).sum(axis=1) / 2
+             + g_nu.sum(axis=1)) / n_nu - 1. / 2)
+
+
+def rulsif_window_scores(data, starts, window_size, alpha):
+    """
+    alpha-PE in both directions for each window pair x = data[i:i+W],
+    y = data[i+W:i+2W], i in starts (consecutive, W apart).
+    Distances between the W-sample blocks are computed once and shared: each
+    block's self-distances serve as x in one window and as y in the next.
+    Returns (score_x_y, score_y_x) arrays.
+    """
+    if len(starts) == 0:
+        return np.empty(0), np.empty(0)
+    data = np.ascontiguousarray(data)
+    # Non-overlapping W-sample blocks as a zero-copy strided view: block k is
+    # x of window k and y of window k-1
+    blocks = np.lib.stride_tricks.sliding_window_view(
+        data[starts[0]:], (window_size, data.shape[1])
+    )[::window_size, 0][:len(starts) + 1]
+    # Distances are formed in the input precision (exact for the integer-valued
+    # float32 sensor readings) and widened to float64 for the kernel solves
+    self_d = _sq_dists(blocks, blocks).astype(np.float64)            # block k vs its own samples
+    cross_d = _sq_dists(blocks[1:], blocks[:-1]).astype(np.float64)  # block k+1 vs block k
+
+    sigma_range = RULSIF_SIGMA_RANGE
+    if RULSIF_MEDIAN_WIDTH:
+        width = median_kernel_width(data)
+        if width is not None:
+            sigma_range = np.array([width])
+
+    n = len(starts)
+    d_nu = np.concatenate([self_d[:-1], self_d[1:]])
+    d_de = np.concatenate([cross_d, cross_d.transpose(0, 2, 1)])
+    if len(d_nu) <= RULSIF_CHUNK:
+        pe = _rulsif_alpha_pe(d_nu, d_de, alpha, sigma_range)
+    else:
+        bounds = range(0, len(d_nu), RULSIF_CHUNK)
+        pe = np.concatenate(list(_rulsif_pool.map(
+            lambda lo: _rulsif_alpha_pe(d_nu[lo:lo + RULSIF_CHUNK], d_de[lo:lo + RULSIF_CHUNK],
+                                        alpha, sigma_range),
+            bounds
+        )))
+    return pe[:n], pe[n:]
+
+
+def get_change_point_scores(filename, start_time, window_size=50):
+    original_data = filename
+
+    # float32 halves the window blocks; GSR/HR are small integers, exact in float32
+    data = np.ascontiguousarray(original_data[['GSR', 'HR']].to_numpy(dtype=np.float32))
     path = './score/'
-    out_file = open(path +str(start_time)+"scores.csv", "w+")
-    # x = filename.split("/")[len(filename.split("/")) - 1].split(".")[0] + "_scores.csv"
-    # print(x)
 
-    out_file.write("Start,Border,End,Score\n")
-    scores = []
+    csv_rows = []  # Written in one go after the loop; nothing tails this file
     db_scores = []  # Collect scores for MongoDB insertion
-    # print("len of data", len(data))
-    for i in range(0, len(data) - 2 * window_size, window_size):
-        # Creating samples
-        x = data[i:i + window_size, :]
-        # print(x.shape)
-        y = data[i + window_size:i + 2 * window_size, :]
-        # print(y.shape)
-
-        alpha = 0.1  # needed for RuLSif
+    alpha = 0.1  # needed for RuLSif
+    starts = list(range(0, len(data) - 2 * window_size, window_size))
 
-        # calculating x to y
-        densratio_obj = densratio(x, y, alpha=alpha)
-        score_x_y = float(densratio_obj.alpha_PE)
+    # calculating x to y and y to x for every window in one batch
+    scores_x_y, scores_y_x = rulsif_window_scores(data, starts, window_size, alpha)
+    ts = np.ascontiguousarray(original_data['timestamp'].to_numpy(dtype=np.int64))
 
-        # calculating y to x
-        densratio_obj = densratio(y, x, alpha=alpha)
-        score_y_x = float(densratio_obj.alpha_PE)
+    for n, i in enumerate(starts):
+        score_x_y = float(scores_x_y[n])
+        score_y_x = float(scores_y_x[n])
 
         '''Total change point score = score_x_y + score_y_x -- Taking absolute'''
-        start_ts = int(original_data['timestamp'].iat[i])
-        border_ts = int(original_data['timestamp'].iat[i + window_size])
-        end_ts = int(original_data['timestamp'].iat[i + 2 * window_size])
+        start_ts = int(ts[i])
+        border_ts = int(ts[i + window_size])
+        end_ts = int(ts[i + 2 * window_size])
         total_score = abs(score_x_y) + abs(score_y_x)
         
         # DUAL WRITE: CSV file (existing functionality)
-        out_file.write(str(start_ts) + "," + str(border_ts) + "," + str(end_ts) + "," + str(total_score) + "\n")
-        out_file.flush()
+        csv_rows.append((start_ts, border_ts, end_ts, total_score))
         
         # Collect for MongoDB insertion
         if DB_ENABLED:
@@ -83,20 +196,17 @@ def get_change_point_scores(filename, start_time, window_size=50):
                 'score': total_score
             })
     
-    out_file.close()
+    with open(path + str(start_time) + "scores.csv", "w", newline='') as out_file:
+        writer = csv.writer(out_file, lineterminator='\n')
+        writer.writerow(('Start', 'Border', 'End', 'Score'))
+        writer.writerows(csv_rows)
     
     # DUAL WRITE: MongoDB (new functionality)
     if DB_ENABLED and db_scores:
         try:
-            for score_data in db_scores:
-                insert_change_score(
-                    start_time=start_time,
-                    start=score_data['start'],
-                    border=score_data['border'],
-                    end=score_data['end'],
-                    score=score_data['score']
-                )
-            print(f"📊 Inserted {len(db_scores)} change scores to MongoDB")
+            # One round-trip for the whole window
+            if insert_change_scores_bulk(start_time, db_scores):
+                print(f"📊 Inserted {len(db_scores)} change scores to MongoDB")
         except Exception as e:
             print(f"⚠️  MongoDB insert failed for change scores: {e}. CSV backup intact.")
 
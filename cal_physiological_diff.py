@@ -1,10 +1,72 @@
+import csv
+import threading
 import numpy as np
-import pandas as pd
+
+# Optional JIT for the window-mean kernel on long recordings (pip install numba)
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 video_id = [1, 2, 3, 4, 5, 6, 7, 8]
 
+# (valence, arousal) label of each stimulus video
+VIDEO_LABELS = {
+    1: (1, 1),
+    2: (0, 1),
+    3: (0, 0),
+    4: (1, 0),
+    5: (1, 0),
+    6: (1, 0),
+    7: (0, 1),
+    8: (0, 1),
+}
+
+# Below this many samples per video the NumPy path is already faster than a
+# parallel kernel launch
+NUMBA_MIN_SAMPLES = 100000
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True)
+    def _block_absdiff_jit(data, n_windows, window, gsr_base, hr_base):
+        """Block means of GSR/HR and their distance from the baseline, one pass per window"""
+        gsr = np.empty(n_windows)
+        hr = np.empty(n_windows)
+        for i in numba.prange(n_windows):
+            s0 = 0.0
+            s1 = 0.0
+            base = i * window
+            for j in range(window):
+                s0 += data[base + j, 0]
+                s1 += data[base + j, 1]
+            gsr[i] = abs(gsr_base - s0 / window)
+            hr[i] = abs(hr_base - s1 / window)
+        return gsr, hr
+
+def block_absdiff(data, n_windows, window, gsr_base, hr_base):
+    """|baseline - mean| of GSR and HR for each non-overlapping window of data"""
+    if NUMBA_AVAILABLE and len(data) >= NUMBA_MIN_SAMPLES:
+        return _block_absdiff_jit(np.ascontiguousarray(data), n_windows, window,
+                                  gsr_base, hr_base)
+    # float32 samples, float64 accumulator
+    means = data[:n_windows * window].reshape(n_windows, window, 2).mean(axis=1, dtype=np.float64)
+    return np.abs(gsr_base - means[:, 0]), np.abs(hr_base - means[:, 1])
+
+WINDOWDATA_PATH = 'final/windowdata.csv'
+WINDOWDATA_HEADER = ["Start_time", "Score", "GSR_diff", "HR_diff", "Previous_window",
+                     "valence_acc_video", "arousal_acc_video", "video_id"]
+
+# Keeps concurrent calls from interleaving their rows (and header check)
+_windowdata_lock = threading.Lock()
+
+# features document key for each windowdata.csv column, in column order
+FEATURE_DOC_KEYS = ('start_time', 'score', 'gsr_diff', 'hr_diff', 'previous_window',
+                    'valence_acc_video', 'arousal_acc_video', 'video_id')
+
 # MongoDB integration - dual write (CSV + DB)
 try:
-    from db_models import insert_feature
+    from db_models import insert_feature, insert_feature_many
     DB_ENABLED = True
 except ImportError as e:
     DB_ENABLED = False
@@ -27,268 +89,77 @@ def insert_feature_to_db(start_time, score, gsr_diff, hr_diff, prev_window, vale
         except Exception as e:
             print(f"⚠️  MongoDB insert failed for feature: {e}")
 
+def insert_features_to_db(docs):
+    """Insert the feature documents collected by one get_signal_diff call (dual write)"""
+    if DB_ENABLED and docs:
+        try:
+            insert_feature_many(docs)
+        except Exception as e:
+            print(f"⚠️  MongoDB bulk insert failed for features: {e}")
+
+def video_window_diffs(signals, gsr_base, hr_base, window_size=50):
+    """(GSR_diff, HR_diff) arrays for one video's GSR/HR samples"""
+    # Sensor readings are small integers, exact in float32
+    data = signals.to_numpy(dtype=np.float32)
+    # Non-overlapping blocks, same count as range(0, len(data) - window_size, window_size)
+    n_windows = max(0, (len(data) - 1) // window_size)
+    return block_absdiff(data, n_windows, window_size, gsr_base, hr_base)
+
+def read_first_score(score_path):
+    """Score column of the first data row in a scores CSV, or None if it has no rows"""
+    with open(score_path) as f:
+        header = f.readline().rstrip('\r\n').split(',')
+        first = f.readline().rstrip('\r\n')
+    if not first:
+        return None
+    return float(first.split(',')[header.index('Score')])
+
 def get_signal_diff(filename, filename_bs, start_time, pred):
         #print("start", start_time)
         original = filename
-        path = './final/'
-        out_file = open(path + "windowdata.csv", "a+")
 
-        bs_data = filename_bs[['GSR', 'HR']]
-        bs_data = np.asanyarray(bs_data)
-        GSR_meanblue = bs_data[:, 0].mean()
-        HR_meanblue = bs_data[:, 1].mean()
+        base = filename_bs[['GSR', 'HR']].to_numpy(dtype=np.float64, copy=False).mean(axis=0)
+        GSR_meanblue, HR_meanblue = float(base[0]), float(base[1])
         print("PRED", pred)
 
+        # Same score file for every video; read it once per call
+        score_value = read_first_score("score/" + str(start_time) + "scores.csv")
+        # The emitted (first) window follows pred[-2]; callers seed pred with [3, 2]
+        prev_window = pred[-2] if len(pred) >= 2 else None
+        if prev_window is None:
+                print("⚠️  Fewer than 2 previous predictions, no feature rows written")
+        pending_docs = []  # Feature documents, inserted together after the loop
+        rows_written = 0
+
+        # One buffered handle for every row of this call
+        with _windowdata_lock, open(WINDOWDATA_PATH, 'a', newline='', buffering=1 << 16) as out_file:
+                writer = csv.writer(out_file, lineterminator='\n')
+                # Append mode opens at the end: position 0 means a new (or
+                # rotated/truncated) file, same rule as api's _WindowDataWriter
+                if out_file.tell() == 0:
+                        writer.writerow(WINDOWDATA_HEADER)
+
+                # Window differences for every video in one groupby pass
+                diffs = original.groupby('video_id', sort=False)[['GSR', 'HR']].apply(
+                        video_window_diffs, gsr_base=GSR_meanblue, hr_base=HR_meanblue)
+
+                for v in video_id:
+                        if v in diffs.index:
+                                GSR_diff, HR_diff = diffs[v]
+                                valence, arousal = VIDEO_LABELS[v]
+                                if score_value is not None and prev_window is not None and len(GSR_diff):
+                                        # Only the leading window is emitted: the model input
+                                        # lookup (main.py, api/video_session_manager.py) takes
+                                        # the rows before this Start_time as one row per 5 s step
+                                        row = (start_time, score_value, float(GSR_diff[0]), float(HR_diff[0]),
+                                               prev_window, valence, arousal, v)
+
+                                        # DUAL WRITE: CSV file (existing functionality)
+                                        writer.writerow(row)
+                                        rows_written += 1
 
-
-        for v in video_id:
-                index = original["video_id"] == v
-                original_data = original[index]
-                if not original_data.empty:
-                        data = original_data[['GSR', 'HR']]
-                        data = np.asanyarray(data)
-                        window_size = 50
-                        GSR_diff = []
-                        HR_diff = []
-                        prev_window_values = []  # Store values for 'prev_window'
-
-                        for i in range(0, len(data) - window_size, window_size):
-                            x = data[i:i + window_size, :]
-
-                            xGSR_mean = x[:, 0].mean()
-                            a = abs(GSR_meanblue - xGSR_mean)
-                            GSR_diff.append(a)
-
-                            xHR_mean = x[:, 1].mean()
-                            b = abs(HR_meanblue - xHR_mean)
-                            HR_diff.append(b)
-
-                            # Handle prev_window assignment correctly
-                            if 'pred' in locals() and len(pred) >= 2:
-                                if i == 0:
-                                    prev_window_values.append(pred[-2])
-                                # elif i == window_size:
-                                #     prev_window_values.append(pred[-1])
-                                else:
-                                    prev_window_values.append(pred[-1])
-
-                        # Create DataFrame after loop to avoid column length mismatch
-                        new_window = pd.DataFrame({
-                            'GSR_diff': GSR_diff,
-                            'HR_diff': HR_diff,
-                            'prev_window': prev_window_values
-                        })
-
-                        if (v == 1):
-                                        new_window["valence_acc_video"] = 1
-                                        new_window["arousal_acc_video"] = 1
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                                "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                # DUAL WRITE: CSV file (existing functionality)
-                                                out_file.write(
-                                                        f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                        f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                        f"{new_window['video_id'].iloc[0]}\n"
-                                                )
-                                        
-                                        # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           1, 1, v)
-                        elif(v == 2):
-                                        new_window["valence_acc_video"] = 0
-                                        new_window["arousal_acc_video"] = 1
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                            "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                # DUAL WRITE: CSV file (existing functionality)
-                                                out_file.write(
-                                                        f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                        f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                        f"{new_window['video_id'].iloc[0]}\n"
-                                                )
-                                        
-                                        # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           0, 1, v)
-                        elif(v == 3):
-                                        new_window["valence_acc_video"] = 0
-                                        new_window["arousal_acc_video"] = 0
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/"+ str(start_time)+"scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        if not scores.empty and not new_window.empty:
-                                                with open('final/windowdata.csv', 'a') as out_file:
-                                                        # Check if the file is empty
-                                                        if out_file.tell() == 0:
-                                                                # If the file is empty, write the header
-                                                                out_file.write(
-                                                                    "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                                # DUAL WRITE: CSV file (existing functionality)
-                                                        out_file.write(
-                                                                    f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                                    f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                                    f"{new_window['video_id'].iloc[0]}\n"
-                                                                )
-                                                
-                                                # DUAL WRITE: MongoDB (new functionality)
-                                                insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                                   new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                                   0, 0, v)
-
-                        elif(v == 4):
-                                        new_window["valence_acc_video"] = 1
-                                        new_window["arousal_acc_video"] = 0
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                             "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                # DUAL WRITE: CSV file (existing functionality)
-                                                out_file.write(
-                                                        f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                        f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                        f"{new_window['video_id'].iloc[0]}\n"
-                                                )
-                                        
-                                        # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           1, 0, v)
-                        elif(v == 5):
-                                        new_window["valence_acc_video"] = 1
-                                        new_window["arousal_acc_video"] = 0
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                            "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                        # DUAL WRITE: CSV file (existing functionality)
-                                                        out_file.write(
-                                                            f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                            f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                            f"{new_window['video_id'].iloc[0]}\n"
-                                                        )
-                                        
-                                        # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           1, 0, v)
-                        elif(v == 6):
-                                        new_window["valence_acc_video"] = 1
-                                        new_window["arousal_acc_video"] = 0
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                            "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                        # DUAL WRITE: CSV file (existing functionality)
-                                                        out_file.write(
-                                                            f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                            f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                            f"{new_window['video_id'].iloc[0]}\n"
-                                                        )
-                                        
-                                        # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           1, 0, v)
-                        elif(v == 7):
-                                        new_window["valence_acc_video"] = 0
-                                        new_window["arousal_acc_video"] = 1
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                            "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                        # DUAL WRITE: CSV file (existing functionality)
-                                                        out_file.write(
-                                                            f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                            f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                            f"{new_window['video_id'].iloc[0]}\n"
-                                                        )
-                                        
-                                        # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           0, 1, v)
-                        elif(v == 8):
-                                        new_window["valence_acc_video"] = 0
-                                        new_window["arousal_acc_video"] = 1
-                                        new_window["video_id"] = v
-                                        scores = pd.read_csv("score/" + str(start_time) + "scores.csv")
-                                        # scores = scores[['Score']]
-                                        result = pd.concat([scores, new_window], axis=1)
-                                        # Open the file in append mode
-                                        with open('final/windowdata.csv', 'a') as out_file:
-                                                # Check if the file is empty
-                                                if out_file.tell() == 0:
-                                                        # If the file is empty, write the header
-                                                        out_file.write(
-                                                                "Start_time,Score,GSR_diff,HR_diff,Previous_window,valence_acc_video,arousal_acc_video,video_id\n")
-
-                                                # DUAL WRITE: CSV file (existing functionality)
-                                                out_file.write(
-                                                        f"{start_time},{scores['Score'].iloc[0]},{new_window['GSR_diff'].iloc[0]},{new_window['HR_diff'].iloc[0]},"
-                                                        f"{new_window['prev_window'].iloc[0]},{new_window['valence_acc_video'].iloc[0]},{new_window['arousal_acc_video'].iloc[0]},"
-                                                        f"{new_window['video_id'].iloc[0]}\n"
-                                                )
-                                        
                                         # DUAL WRITE: MongoDB (new functionality)
-                                        insert_feature_to_db(start_time, scores['Score'].iloc[0], new_window['GSR_diff'].iloc[0],
-                                                           new_window['HR_diff'].iloc[0], new_window['prev_window'].iloc[0],
-                                                           0, 1, v)
-        final_feature = pd.read_csv("final/windowdata.csv")
-        print(f"now{final_feature}")
+                                        pending_docs.append(dict(zip(FEATURE_DOC_KEYS, row)))
+        insert_features_to_db(pending_docs)
+        print(f"now: appended {rows_written} rows to final/windowdata.csv")
 
@@ -5,11 +5,24 @@ Database connection settings and configuration
 
 from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+import asyncio
 import logging
+import os
+import weakref
+
+# Optional asyncio driver for the async insert helpers (pip install motor)
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    MOTOR_AVAILABLE = True
+except ImportError:
+    MOTOR_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Per-write INFO messages (video starts, clears) are skipped entirely at
+# SURJA_DB_LOG_LEVEL=WARNING, the suggested production setting
+logger.setLevel(os.environ.get('SURJA_DB_LOG_LEVEL', 'INFO').upper())
 
 # MongoDB Connection Settings
 MONGODB_HOST = "localhost"
@@ -17,6 +30,15 @@ MONGODB_PORT = 27017
 DATABASE_NAME = "surja_db"
 CONNECTION_TIMEOUT = 5000  # milliseconds
 
+# Connection pool (MongoClient is a thread-safe pool shared by the whole process)
+MAX_POOL_SIZE = 200
+MIN_POOL_SIZE = 10             # Sockets kept warm for request bursts
+MAX_IDLE_TIME_MS = 300000      # Close sockets idle for 5 minutes
+WAIT_QUEUE_TIMEOUT_MS = 2000   # Fail fast instead of queueing when the pool is exhausted
+
+# Active predictions stay visible this long unless cleared earlier
+ACTIVE_PREDICTION_TTL_SECONDS = 3600
+
 # Collection Names
 COLLECTIONS = {
     'signals': 'signals',                      # Raw physiological signals
@@ -35,6 +57,7 @@ class DatabaseConnection:
     _instance = None
     _client = None
     _db = None
+    _pid = None  # Process that created _client
     
     def __new__(cls):
         """Singleton pattern to ensure single connection"""
@@ -44,13 +67,24 @@ class DatabaseConnection:
     
     def connect(self):
         """Establish connection to MongoDB"""
+        if self._client is not None and self._pid != os.getpid():
+            # Forked worker: sockets inherited from the parent are not safe to
+            # share, so build a fresh client (the parent keeps its own)
+            self._client = None
+            self._db = None
         if self._client is None:
             try:
                 self._client = MongoClient(
                     host=MONGODB_HOST,
                     port=MONGODB_PORT,
-                    serverSelectionTimeoutMS=CONNECTION_TIMEOUT
+                    serverSelectionTimeoutMS=CONNECTION_TIMEOUT,
+                    maxPoolSize=MAX_POOL_SIZE,
+                    minPoolSize=MIN_POOL_SIZE,
+                    maxIdleTimeMS=MAX_IDLE_TIME_MS,
+                    waitQueueTimeoutMS=WAIT_QUEUE_TIMEOUT_MS,
+                    retryWrites=True
                 )
+                self._pid = os.getpid()
                 # Test connection
                 self._client.admin.command('ping')
                 self._db = self._client[DATABASE_NAME]
@@ -81,21 +115,169 @@ class DatabaseConnection:
             self._client.close()
             self._client = None
             self._db = None
+            _reset_handles()
             logger.info("🔌 MongoDB connection closed")
 
 
-def get_db():
-    """Helper function to get database instance"""
+# Database and collection handles for the current process, built on first use
+# so the per-operation helpers below are a pid check and a dict lookup
+_cached_db = None
+_cached_collections = {}
+_cached_pid = None
+
+
+def _load_handles():
+    """Connect (once per process) and cache the database and collection handles"""
+    global _cached_db, _cached_collections, _cached_pid
     conn = DatabaseConnection()
     conn.connect()
-    return conn.get_database()
+    db = conn.get_database()
+    if db is None:
+        return False
+    _cached_db = db
+    _cached_collections = {name: db[coll] for name, coll in COLLECTIONS.items()}
+    _cached_pid = os.getpid()
+    return True
+
+
+def _reset_handles():
+    """Forget cached handles (next access reconnects)"""
+    global _cached_pid
+    _cached_pid = None
+
+
+def get_db():
+    """Helper function to get database instance"""
+    if _cached_pid != os.getpid() and not _load_handles():
+        return None
+    return _cached_db
 
 
 def get_collection(collection_name):
     """Helper function to get collection instance"""
-    conn = DatabaseConnection()
-    conn.connect()
-    return conn.get_collection(collection_name)
+    if _cached_pid != os.getpid() and not _load_handles():
+        return None
+    return _cached_collections[collection_name]
+
+
+_INTEGER = {'bsonType': ['int', 'long']}
+_NUMBER = {'bsonType': ['double', 'int', 'long']}
+
+# Server-side type checks for the high-volume collections. 'moderate' leaves
+# documents written before the validator was attached untouched.
+SCHEMA_VALIDATORS = {
+    'signals': {'$jsonSchema': {
+        'bsonType': 'object',
+        'required': ['time_series', 'gsr', 'hr', 'timestamp'],
+        'properties': {
+            'time_series': _INTEGER,
+            'gsr': _INTEGER,
+            'hr': _INTEGER,
+            'timestamp': _INTEGER,
+            'video_id': _INTEGER,
+            'user_id': {'bsonType': 'string'},
+            'session_id': {'bsonType': 'string'}
+        }
+    }},
+    'features': {'$jsonSchema': {
+        'bsonType': 'object',
+        'required': ['start_time', 'score', 'gsr_diff', 'hr_diff', 'video_id'],
+        'properties': {
+            'start_time': _INTEGER,
+            'score': _NUMBER,
+            'gsr_diff': _NUMBER,
+            'hr_diff': _NUMBER,
+            'previous_window': _INTEGER,
+            'valence_acc_video': _INTEGER,
+            'arousal_acc_video': _INTEGER,
+            'video_id': _INTEGER
+        }
+    }},
+    'change_scores': {'$jsonSchema': {
+        'bsonType': 'object',
+        'required': ['start_time', 'start', 'border', 'end', 'score'],
+        'properties': {
+            'start_time': _INTEGER,
+            'start': _INTEGER,
+            'border': _INTEGER,
+            'end': _INTEGER,
+            'score': _NUMBER
+        }
+    }},
+    'predictions': {'$jsonSchema': {
+        'bsonType': 'object',
+        'required': ['starttime', 'video_no', 'probe'],
+        'properties': {
+            'starttime': _INTEGER,
+            'video_no': _INTEGER,
+            'probe': {'bsonType': 'string'},
+            'cluster_id': _INTEGER
+        }
+    }},
+}
+
+
+def _apply_validators(db):
+    """Attach SCHEMA_VALIDATORS, creating collections that do not exist yet"""
+    existing = set(db.list_collection_names())
+    for collection_name, validator in SCHEMA_VALIDATORS.items():
+        name = COLLECTIONS[collection_name]
+        if name in existing:
+            db.command('collMod', name, validator=validator, validationLevel='moderate')
+        else:
+            db.create_collection(name, validator=validator, validationLevel='moderate')
+        logger.info(f"✅ Schema validator set for '{collection_name}'")
+
+
+# Single-field/shorter indexes made redundant by a compound index with the same
+# leading keys; dropped from existing databases by initialize_indexes
+REDUNDANT_INDEXES = {
+    'signals': ['user_id_1'],
+    'video_starts': ['user_id_1'],
+    'predictions': ['user_id_1', 'user_id_1_video_no_1'],
+    'active_predictions': [
+        'user_id_1',
+        'created_at_1',  # Former created_at TTL, replaced by the expires_at TTL
+    ],
+}
+
+
+def _drop_redundant_indexes(db):
+    """Drop indexes listed in REDUNDANT_INDEXES that still exist"""
+    for collection_name, index_names in REDUNDANT_INDEXES.items():
+        collection = db[COLLECTIONS[collection_name]]
+        existing = collection.index_information()
+        for name in index_names:
+            if name in existing:
+                collection.drop_index(name)
+                logger.info(f"🗑️  Dropped redundant index '{name}' on '{collection_name}'")
+
+
+# One motor client per event loop (motor clients are bound to the loop that
+# first uses them); entries go away with their loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_collection(collection_name):
+    """Motor collection for the running event loop, same pool settings as the sync client"""
+    if not MOTOR_AVAILABLE:
+        raise RuntimeError("motor is not installed")
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncIOMotorClient(
+            host=MONGODB_HOST,
+            port=MONGODB_PORT,
+            serverSelectionTimeoutMS=CONNECTION_TIMEOUT,
+            maxPoolSize=MAX_POOL_SIZE,
+            minPoolSize=MIN_POOL_SIZE,
+            maxIdleTimeMS=MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=WAIT_QUEUE_TIMEOUT_MS,
+            retryWrites=True,
+            io_loop=loop
+        )
+        _async_clients[loop] = client
+    return client[DATABASE_NAME][COLLECTIONS[collection_name]]
 
 
 def initialize_indexes():
@@ -114,8 +296,7 @@ def initialize_indexes():
         # Signals collection indexes
         db[COLLECTIONS['signals']].create_index([("timestamp", ASCENDING)])
         db[COLLECTIONS['signals']].create_index([("created_at", DESCENDING)])
-        # Multi-user support indexes
-        db[COLLECTIONS['signals']].create_index([("user_id", ASCENDING)])
+        # Multi-user support indexes (user_id-only queries use the compound prefix)
         db[COLLECTIONS['signals']].create_index([("session_id", ASCENDING)])
         db[COLLECTIONS['signals']].create_index([("user_id", ASCENDING), ("video_id", ASCENDING)])
         logger.info("✅ Created indexes for 'signals' collection (including user_id)")
@@ -124,8 +305,7 @@ def initialize_indexes():
         db[COLLECTIONS['video_starts']].create_index([("video_id", ASCENDING)])
         db[COLLECTIONS['video_starts']].create_index([("timestamp", ASCENDING)])
         db[COLLECTIONS['video_starts']].create_index([("created_at", DESCENDING)])
-        # Multi-user support indexes
-        db[COLLECTIONS['video_starts']].create_index([("user_id", ASCENDING)])
+        # Multi-user support indexes (user_id-only queries use the compound prefix)
         db[COLLECTIONS['video_starts']].create_index([("session_id", ASCENDING)])
         db[COLLECTIONS['video_starts']].create_index([("user_id", ASCENDING), ("video_id", ASCENDING)])
         logger.info("✅ Created indexes for 'video_starts' collection (including user_id)")
@@ -145,6 +325,8 @@ def initialize_indexes():
         db[COLLECTIONS['features']].create_index([("start_time", ASCENDING)])
         db[COLLECTIONS['features']].create_index([("video_id", ASCENDING)])
         db[COLLECTIONS['features']].create_index([("created_at", DESCENDING)])
+        # Per-video emotion timelines filter on video_id and sort by start_time
+        db[COLLECTIONS['features']].create_index([("video_id", ASCENDING), ("start_time", ASCENDING)])
         logger.info("✅ Created indexes for 'features' collection")
         
         # Predictions collection indexes
@@ -152,32 +334,46 @@ def initialize_indexes():
         db[COLLECTIONS['predictions']].create_index([("video_no", ASCENDING)])
         db[COLLECTIONS['predictions']].create_index([("created_at", DESCENDING)])
         # Multi-user support indexes (compound for efficient filtering)
-        db[COLLECTIONS['predictions']].create_index([("user_id", ASCENDING)])
         db[COLLECTIONS['predictions']].create_index([("session_id", ASCENDING)])
-        db[COLLECTIONS['predictions']].create_index([("user_id", ASCENDING), ("video_no", ASCENDING)])
+        # Its prefixes also serve user_id and user_id + video_no queries
         db[COLLECTIONS['predictions']].create_index([("user_id", ASCENDING), ("video_no", ASCENDING), ("starttime", ASCENDING)])
+        # Video timeline: video_no + optional user/session equality, sorted by starttime
+        db[COLLECTIONS['predictions']].create_index([
+            ("video_no", ASCENDING), ("user_id", ASCENDING),
+            ("session_id", ASCENDING), ("starttime", ASCENDING)
+        ])
         logger.info("✅ Created indexes for 'predictions' collection (including user_id)")
         
         # Active predictions collection indexes
         db[COLLECTIONS['active_predictions']].create_index([("video_no", ASCENDING)])
         db[COLLECTIONS['active_predictions']].create_index([("created_at", DESCENDING)])
-        # TTL index to auto-delete old predictions after 1 hour
+        # TTL index: each document is deleted once its expires_at has passed
+        # (set ACTIVE_PREDICTION_TTL_SECONDS ahead on insert, or to now when cleared)
         db[COLLECTIONS['active_predictions']].create_index(
-            [("created_at", ASCENDING)], 
-            expireAfterSeconds=3600
+            [("expires_at", ASCENDING)], 
+            expireAfterSeconds=0
         )
-        # Multi-user support indexes
-        db[COLLECTIONS['active_predictions']].create_index([("user_id", ASCENDING)])
+        # Multi-user support indexes (user_id-only queries use the compound prefix)
         db[COLLECTIONS['active_predictions']].create_index([("session_id", ASCENDING)])
         db[COLLECTIONS['active_predictions']].create_index([("user_id", ASCENDING), ("video_no", ASCENDING)])
         logger.info("✅ Created indexes for 'active_predictions' collection (with TTL + user_id)")
         
+        _drop_redundant_indexes(db)
+        
         logger.info("✅ All indexes created successfully!")
-        return True
         
     except Exception as e:
         logger.error(f"❌ Error creating indexes: {e}")
         return False
+    
+    # Validators are optional hardening: collMod needs a privilege the app user
+    # may lack (or an older server may reject), which must not cost the indexes
+    try:
+        _apply_validators(db)
+    except Exception as e:
+        logger.warning(f"⚠️  Schema validators not applied: {e}")
+    
+    return True
 
 
 if __name__ == "__main__":
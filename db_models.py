@@ -3,16 +3,87 @@ MongoDB Data Models and Helper Functions for SURJA System
 Provides CRUD operations for all collections
 """
 
-from datetime import datetime
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import islice
 from typing import List, Dict, Any, Optional
 import pandas as pd
-from db_config import get_collection, logger
+from pymongo import InsertOne, WriteConcern
+from pymongo.errors import BulkWriteError
+from db_config import (get_collection, get_async_collection, logger,
+                       ACTIVE_PREDICTION_TTL_SECONDS, MOTOR_AVAILABLE)
+
+
+# Documents per server round-trip for large reads (driver default is 101)
+CURSOR_BATCH_SIZE = 5000
+# Rows per intermediate DataFrame when draining a cursor, bounding peak memory
+FRAME_CHUNK_ROWS = 50000
+
+
+def _cursor_frame(cursor, fields: Dict[str, int]) -> pd.DataFrame:
+    """
+    Build a DataFrame from a cursor in FRAME_CHUNK_ROWS slices instead of
+    materializing every document in one list first.
+    Columns are the projected fields (minus _id); empty result -> empty DataFrame.
+    """
+    columns = [name for name in fields if name != '_id']
+    cursor = cursor.batch_size(CURSOR_BATCH_SIZE)
+    chunks = []
+    while True:
+        chunk = pd.DataFrame.from_records(list(islice(cursor, FRAME_CHUNK_ROWS)), columns=columns)
+        if chunk.empty:
+            break
+        chunks.append(chunk)
+        if len(chunk) < FRAME_CHUNK_ROWS:
+            break
+    if not chunks:
+        return pd.DataFrame()
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
 
 
 # ============================================================================
 # SIGNALS COLLECTION (replaces signals_data.csv)
 # ============================================================================
 
+# Server-side projections: only the fields the returned DataFrames keep
+_SIGNAL_FIELDS = {'_id': 0, 'time_series': 1, 'gsr': 1, 'hr': 1, 'timestamp': 1, 'datetime': 1}
+
+def _build_signal_doc(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Signal document for one reading; optional fields only when provided"""
+    time_series = data.get('time_series', 0)
+    gsr = data.get('gsr', 0)
+    hr = data.get('hr', 0)
+    timestamp = data.get('timestamp', 0)
+    # Readings parsed by signals.py are already ints; coerce only other input
+    # (strings, NumPy scalars, which BSON cannot encode). The signals schema
+    # validator enforces the types server-side.
+    if not (type(time_series) is type(gsr) is type(hr) is type(timestamp) is int):
+        time_series, gsr, hr, timestamp = int(time_series), int(gsr), int(hr), int(timestamp)
+    doc = {
+        'time_series': time_series,
+        'gsr': gsr,
+        'hr': hr,
+        'timestamp': timestamp,
+        'datetime': data.get('datetime'),
+        'created_at': now
+    }
+    
+    # Add optional fields if provided (backward compatible)
+    if data.get('user_id') is not None:
+        doc['user_id'] = str(data['user_id'])
+    if data.get('video_id') is not None:
+        doc['video_id'] = int(data['video_id'])
+    if data.get('session_id') is not None:
+        doc['session_id'] = str(data['session_id'])
+    
+    return doc
+
+
 def insert_signal(data: Dict[str, Any]) -> bool:
     """
     Insert a single physiological signal reading
@@ -26,65 +97,60 @@ def insert_signal(data: Dict[str, Any]) -> bool:
     """
     try:
         collection = get_collection('signals')
-        document = {
-            'time_series': int(data.get('time_series', 0)),
-            'gsr': int(data.get('gsr', 0)),
-            'hr': int(data.get('hr', 0)),
-            'timestamp': int(data.get('timestamp', 0)),
-            'datetime': data.get('datetime'),
-            'created_at': datetime.now()
-        }
-        
-        # Add optional fields if provided (backward compatible)
-        if 'user_id' in data and data['user_id'] is not None:
-            document['user_id'] = str(data['user_id'])
-        if 'video_id' in data and data['video_id'] is not None:
-            document['video_id'] = int(data['video_id'])
-        if 'session_id' in data and data['session_id'] is not None:
-            document['session_id'] = str(data['session_id'])
-        
-        collection.insert_one(document)
+        collection.insert_one(_build_signal_doc(data, datetime.now()))
         return True
     except Exception as e:
         logger.error(f"Error inserting signal: {e}")
         return False
 
 
-def insert_signals_bulk(data_list: List[Dict[str, Any]]) -> bool:
+def insert_signal_fast(data: Dict[str, Any]) -> bool:
+    """
+    Fire-and-forget variant of insert_signal for high-rate sensor ingest
+    
+    Sent with write concern w=0: the call returns once the message is on the
+    wire, without waiting for the server, so rejected or lost samples are not
+    reported. Use insert_signal (or insert_signals_bulk) when the write must
+    be confirmed.
+    
+    Args:
+        data: Same keys as insert_signal
+    
+    Returns:
+        bool: False only if the document could not be built or sent
+    """
+    try:
+        collection = get_collection('signals').with_options(write_concern=WriteConcern(w=0))
+        collection.insert_one(_build_signal_doc(data, datetime.now()))
+        return True
+    except Exception as e:
+        logger.error(f"Error sending signal: {e}")
+        return False
+
+
+def insert_signals_bulk(data_list: List[Dict[str, Any]], acknowledged: bool = True) -> bool:
     """
     Insert multiple signal readings in bulk (more efficient)
     
     Args:
         data_list: List of signal dictionaries
                    Optional keys in each dict: user_id, video_id, session_id (for multi-user support)
+        acknowledged: False sends the batch with w=0 (fire-and-forget) for
+                      high-rate ingest where the CSV backup is the source of truth
     
     Returns:
-        bool: Success status
+        bool: Success status (always True once sent when acknowledged=False)
     """
+    if not data_list:
+        return True
     try:
         collection = get_collection('signals')
-        documents = []
-        for data in data_list:
-            doc = {
-                'time_series': int(data.get('time_series', 0)),
-                'gsr': int(data.get('gsr', 0)),
-                'hr': int(data.get('hr', 0)),
-                'timestamp': int(data.get('timestamp', 0)),
-                'datetime': data.get('datetime'),
-                'created_at': datetime.now()
-            }
-            
-            # Add optional fields if provided (backward compatible)
-            if 'user_id' in data and data['user_id'] is not None:
-                doc['user_id'] = str(data['user_id'])
-            if 'video_id' in data and data['video_id'] is not None:
-                doc['video_id'] = int(data['video_id'])
-            if 'session_id' in data and data['session_id'] is not None:
-                doc['session_id'] = str(data['session_id'])
-            
-            documents.append(doc)
-        
-        collection.insert_many(documents)
+        if not acknowledged:
+            collection = collection.with_options(write_concern=WriteConcern(w=0))
+        now = datetime.now()
+        documents = [_build_signal_doc(data, now) for data in data_list]
+        # Unordered: one bad reading does not stop the rest of the batch
+        collection.insert_many(documents, ordered=False)
         return True
     except Exception as e:
         logger.error(f"Error inserting signals bulk: {e}")
@@ -110,11 +176,10 @@ def get_signals_by_timestamp_range(start_timestamp: int, end_timestamp: int) ->
                 '$lte': end_timestamp
             }
         }
-        cursor = collection.find(query).sort('timestamp', 1)
-        data = list(cursor)
+        cursor = collection.find(query, _SIGNAL_FIELDS).sort('timestamp', 1)
+        df = _cursor_frame(cursor, _SIGNAL_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             # Rename columns to match current CSV format
             df = df.rename(columns={
                 'time_series': 'Time_series',
@@ -138,11 +203,10 @@ def get_all_signals() -> pd.DataFrame:
     """
     try:
         collection = get_collection('signals')
-        cursor = collection.find().sort('timestamp', 1)
-        data = list(cursor)
+        cursor = collection.find({}, _SIGNAL_FIELDS).sort('timestamp', 1)
+        df = _cursor_frame(cursor, _SIGNAL_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             df = df.rename(columns={
                 'time_series': 'Time_series',
                 'gsr': 'GSR',
@@ -190,18 +254,69 @@ def insert_video_start(timestamp: int, video_id: int, user_id: str = None, sessi
             document['session_id'] = str(session_id)
         
         collection.insert_one(document)
-        log_msg = f"✅ Video start recorded: video_id={video_id}, timestamp={timestamp}"
-        if user_id:
-            log_msg += f", user_id={user_id}"
-        if session_id:
-            log_msg += f", session_id={session_id}"
-        logger.info(log_msg)
+        if logger.isEnabledFor(logging.INFO):
+            log_msg = f"✅ Video start recorded: video_id={video_id}, timestamp={timestamp}"
+            if user_id:
+                log_msg += f", user_id={user_id}"
+            if session_id:
+                log_msg += f", session_id={session_id}"
+            logger.info(log_msg)
         return True
     except Exception as e:
         logger.error(f"Error inserting video start: {e}")
         return False
 
 
+def insert_video_starts_bulk(data_list: List[Dict[str, Any]]) -> bool:
+    """
+    Insert multiple video start events in one round-trip
+    
+    Args:
+        data_list: List of dicts with keys: timestamp, video_id
+                   Optional keys: user_id, session_id, created_at (defaults to now)
+    
+    Returns:
+        bool: Success status
+    """
+    if not data_list:
+        return True
+    try:
+        collection = get_collection('video_starts')
+        now = datetime.now()  # One clock read per batch for entries without created_at
+        documents = []
+        for data in data_list:
+            doc = {
+                'timestamp': int(data['timestamp']),
+                'video_id': int(data['video_id']),
+                'created_at': data.get('created_at') or now
+            }
+            
+            # Add optional fields if provided (backward compatible)
+            if data.get('user_id') is not None:
+                doc['user_id'] = str(data['user_id'])
+            if data.get('session_id') is not None:
+                doc['session_id'] = str(data['session_id'])
+            
+            documents.append(doc)
+        
+        # Unordered: one rejected document does not stop the rest of the batch
+        collection.bulk_write([InsertOne(doc) for doc in documents], ordered=False)
+        logger.info("✅ Recorded %d video start(s)", len(documents))
+        return True
+    except BulkWriteError as bwe:
+        logger.error(f"Error inserting video starts bulk: {bwe.details.get('nInserted', 0)} of "
+                     f"{len(data_list)} recorded, {len(bwe.details.get('writeErrors', []))} rejected")
+        return False
+    except Exception as e:
+        logger.error(f"Error inserting video starts bulk: {e}")
+        return False
+
+
+_LATEST_VIDEO_START_FIELDS = {
+    '_id': 0, 'timestamp': 1, 'video_id': 1, 'user_id': 1, 'session_id': 1, 'created_at': 1
+}
+
+
 def get_latest_video_start() -> Optional[Dict[str, Any]]:
     """
     Get the most recent video start event
@@ -211,7 +326,9 @@ def get_latest_video_start() -> Optional[Dict[str, Any]]:
     """
     try:
         collection = get_collection('video_starts')
-        result = collection.find_one(sort=[('created_at', -1)])
+        # Walks the created_at index from the newest entry; only the fields
+        # callers read are returned
+        result = collection.find_one({}, _LATEST_VIDEO_START_FIELDS, sort=[('created_at', -1)])
         return result
     except Exception as e:
         logger.error(f"Error getting latest video start: {e}")
@@ -241,6 +358,39 @@ def get_video_starts_by_id(video_id: int) -> List[Dict[str, Any]]:
 # WINDOWED DATA COLLECTION (replaces test/online_X.csv and test/bs_data.csv)
 # ============================================================================
 
+def _frame_column(data: pd.DataFrame, name: str, dtype, default) -> list:
+    """One DataFrame column as native Python values, or default for every row if absent"""
+    if name not in data.columns:
+        return [default] * len(data)
+    return data[name].astype(dtype).tolist()
+
+
+def _windowed_docs(data: pd.DataFrame, start_time: int, window_type: str) -> List[Dict[str, Any]]:
+    """windowed_data documents for every row of data"""
+    start_time = int(start_time)
+    now = datetime.now()
+    
+    # Column-wise conversion instead of a Series per row (iterrows)
+    return [{
+        'start_time': start_time,
+        'time_series': ts,
+        'gsr': gsr,
+        'hr': hr,
+        'timestamp': timestamp,
+        'time2': time2,
+        'video_id': video_id,
+        'window_type': window_type,
+        'created_at': now
+    } for ts, gsr, hr, timestamp, time2, video_id in zip(
+        _frame_column(data, 'Time_series', 'int64', 0),
+        _frame_column(data, 'GSR', 'float64', 0.0),
+        _frame_column(data, 'HR', 'float64', 0.0),
+        _frame_column(data, 'timestamp', 'int64', 0),
+        _frame_column(data, 'time2', str, ''),
+        _frame_column(data, 'video_id', 'int64', 0)
+    )]
+
+
 def insert_windowed_data(data: pd.DataFrame, start_time: int, window_type: str = 'online') -> bool:
     """
     Insert windowed physiological data
@@ -254,31 +404,39 @@ def insert_windowed_data(data: pd.DataFrame, start_time: int, window_type: str =
         bool: Success status
     """
     try:
+        if data.empty:
+            return False
         collection = get_collection('windowed_data')
-        documents = []
-        
-        for _, row in data.iterrows():
-            documents.append({
-                'start_time': int(start_time),
-                'time_series': int(row.get('Time_series', 0)),
-                'gsr': float(row.get('GSR', 0)),
-                'hr': float(row.get('HR', 0)),
-                'timestamp': int(row.get('timestamp', 0)),
-                'time2': str(row.get('time2', '')),
-                'video_id': int(row.get('video_id', 0)),
-                'window_type': window_type,
-                'created_at': datetime.now()
-            })
-        
-        if documents:
-            collection.insert_many(documents)
-            return True
+        collection.insert_many(_windowed_docs(data, start_time, window_type), ordered=False)
+        return True
+    except Exception as e:
+        logger.error(f"Error inserting windowed data: {e}")
         return False
+
+
+async def insert_windowed_data_async(data: pd.DataFrame, start_time: int,
+                                     window_type: str = 'online') -> bool:
+    """
+    insert_windowed_data for asyncio callers: the insert is awaited instead of
+    blocking the event loop, so the next window can be prepared meanwhile.
+    Uses motor when installed, otherwise runs the synchronous insert on a thread.
+    """
+    if not MOTOR_AVAILABLE:
+        return await asyncio.to_thread(insert_windowed_data, data, start_time, window_type)
+    try:
+        if data.empty:
+            return False
+        collection = get_async_collection('windowed_data')
+        await collection.insert_many(_windowed_docs(data, start_time, window_type), ordered=False)
+        return True
     except Exception as e:
         logger.error(f"Error inserting windowed data: {e}")
         return False
 
 
+_WINDOWED_FIELDS = {'_id': 0, 'time_series': 1, 'gsr': 1, 'hr': 1, 'timestamp': 1, 'time2': 1, 'video_id': 1}
+
+
 def get_windowed_data(start_time: int, window_type: str = 'online') -> pd.DataFrame:
     """
     Get windowed data for a specific time window
@@ -296,11 +454,10 @@ def get_windowed_data(start_time: int, window_type: str = 'online') -> pd.DataFr
             'start_time': start_time,
             'window_type': window_type
         }
-        cursor = collection.find(query).sort('timestamp', 1)
-        data = list(cursor)
+        cursor = collection.find(query, _WINDOWED_FIELDS).sort('timestamp', 1)
+        df = _cursor_frame(cursor, _WINDOWED_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             df = df.rename(columns={
                 'time_series': 'Time_series',
                 'gsr': 'GSR',
@@ -349,6 +506,49 @@ def insert_change_score(start_time: int, start: int, border: int, end: int, scor
         return False
 
 
+def insert_change_scores_bulk(start_time: int, scores: List[Dict[str, Any]]) -> bool:
+    """
+    Insert all change point scores for one window in a single round-trip
+    
+    Args:
+        start_time: Window start time identifier
+        scores: List of dicts with keys: start, border, end, score
+    
+    Returns:
+        bool: Success status
+    """
+    if not scores:
+        return True
+    try:
+        collection = get_collection('change_scores')
+        now = datetime.now()
+        documents = [{
+            'start_time': int(start_time),
+            'start': int(s['start']),
+            'border': int(s['border']),
+            'end': int(s['end']),
+            'score': float(s['score']),
+            'created_at': now
+        } for s in scores]
+        try:
+            collection.insert_many(documents, ordered=False)
+        except BulkWriteError as bwe:
+            # Retry only the documents the server rejected, one at a time
+            failed = [err['index'] for err in bwe.details.get('writeErrors', [])]
+            logger.warning(f"Bulk change score insert rejected {len(failed)} documents, retrying individually")
+            ok = True
+            for i in failed:
+                ok = insert_change_score(start_time, **{k: scores[i][k] for k in ('start', 'border', 'end', 'score')}) and ok
+            return ok
+        return True
+    except Exception as e:
+        logger.error(f"Error inserting change scores bulk: {e}")
+        return False
+
+
+_CHANGE_SCORE_FIELDS = {'_id': 0, 'start': 1, 'border': 1, 'end': 1, 'score': 1}
+
+
 def get_change_scores(start_time: int) -> pd.DataFrame:
     """
     Get change point scores for a specific start time
@@ -362,11 +562,10 @@ def get_change_scores(start_time: int) -> pd.DataFrame:
     try:
         collection = get_collection('change_scores')
         query = {'start_time': start_time}
-        cursor = collection.find(query).sort('start', 1)
-        data = list(cursor)
+        cursor = collection.find(query, _CHANGE_SCORE_FIELDS).sort('start', 1)
+        df = _cursor_frame(cursor, _CHANGE_SCORE_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             # Match CSV format
             df = df.rename(columns={
                 'start': 'Start',
@@ -415,6 +614,48 @@ def insert_feature(data: Dict[str, Any]) -> bool:
         return False
 
 
+def insert_feature_many(data_list: List[Dict[str, Any]]) -> bool:
+    """
+    Insert several feature rows in one round-trip
+
+    Args:
+        data_list: List of feature dicts (same keys as insert_feature)
+
+    Returns:
+        bool: Success status
+    """
+    if not data_list:
+        return True
+    try:
+        collection = get_collection('features')
+        now = datetime.now()
+        documents = [{
+            'start_time': int(data.get('start_time', 0)),
+            'score': float(data.get('score', 0)),
+            'gsr_diff': float(data.get('gsr_diff', 0)),
+            'hr_diff': float(data.get('hr_diff', 0)),
+            'previous_window': int(data.get('previous_window', 0)),
+            'valence_acc_video': int(data.get('valence_acc_video', 0)),
+            'arousal_acc_video': int(data.get('arousal_acc_video', 0)),
+            'video_id': int(data.get('video_id', 0)),
+            'created_at': now
+        } for data in data_list]
+        collection.insert_many(documents, ordered=False)
+        return True
+    except BulkWriteError as bwe:
+        logger.error(f"Bulk feature insert rejected {len(bwe.details.get('writeErrors', []))} documents")
+        return False
+    except Exception as e:
+        logger.error(f"Error inserting features bulk: {e}")
+        return False
+
+
+_FEATURE_FIELDS = {
+    '_id': 0, 'start_time': 1, 'score': 1, 'gsr_diff': 1, 'hr_diff': 1, 'previous_window': 1,
+    'valence_acc_video': 1, 'arousal_acc_video': 1, 'video_id': 1
+}
+
+
 def get_all_features() -> pd.DataFrame:
     """
     Get all extracted features (for model training/prediction)
@@ -424,11 +665,10 @@ def get_all_features() -> pd.DataFrame:
     """
     try:
         collection = get_collection('features')
-        cursor = collection.find().sort('start_time', 1)
-        data = list(cursor)
+        cursor = collection.find({}, _FEATURE_FIELDS).sort('start_time', 1)
+        df = _cursor_frame(cursor, _FEATURE_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             df = df.rename(columns={
                 'start_time': 'Start_time',
                 'score': 'Score',
@@ -460,11 +700,10 @@ def get_features_by_video(video_id: int) -> pd.DataFrame:
     try:
         collection = get_collection('features')
         query = {'video_id': video_id}
-        cursor = collection.find(query).sort('start_time', 1)
-        data = list(cursor)
+        cursor = collection.find(query, _FEATURE_FIELDS).sort('start_time', 1)
+        df = _cursor_frame(cursor, _FEATURE_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             df = df.rename(columns={
                 'start_time': 'Start_time',
                 'score': 'Score',
@@ -525,6 +764,9 @@ def insert_prediction(starttime: int, video_no: int, probe: str, cluster_id: int
         return False
 
 
+_PREDICTION_FIELDS = {'_id': 0, 'starttime': 1, 'video_no': 1, 'probe': 1, 'cluster_id': 1, 'created_at': 1}
+
+
 def get_all_predictions() -> pd.DataFrame:
     """
     Get all predictions
@@ -534,11 +776,10 @@ def get_all_predictions() -> pd.DataFrame:
     """
     try:
         collection = get_collection('predictions')
-        cursor = collection.find().sort('created_at', -1)
-        data = list(cursor)
+        cursor = collection.find({}, _PREDICTION_FIELDS).sort('created_at', -1)
+        df = _cursor_frame(cursor, _PREDICTION_FIELDS)
         
-        if data:
-            df = pd.DataFrame(data)
+        if not df.empty:
             return df[['starttime', 'video_no', 'probe', 'cluster_id', 'created_at']]
         return pd.DataFrame()
     except Exception as e:
@@ -550,10 +791,74 @@ def get_all_predictions() -> pd.DataFrame:
 # ACTIVE PREDICTIONS COLLECTION (replaces annotation_interface/public/pred.csv)
 # ============================================================================
 
+def active_prediction_live_filter() -> Dict[str, Any]:
+    """
+    expires_at condition for active predictions still on display. Cleared or
+    expired documents wait for the TTL monitor (runs every 60 s), so readers
+    filter them out; documents without expires_at count as live.
+    """
+    return {'$not': {'$lte': datetime.now()}}
+
+
+# insert_active_prediction only enqueues; one writer thread inserts whatever
+# arrived within ACTIVE_PREDICTION_FLUSH_SECONDS (up to ACTIVE_PREDICTION_MAX_BATCH)
+# with a single insert_many.
+ACTIVE_PREDICTION_FLUSH_SECONDS = 0.2
+ACTIVE_PREDICTION_MAX_BATCH = 256
+_active_pred_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_active_pred_writer: Optional[threading.Thread] = None
+_active_pred_writer_lock = threading.Lock()
+
+
+def _write_active_predictions(batch: List[Dict[str, Any]]):
+    try:
+        get_collection('active_predictions').insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.error(f"Error inserting {len(batch)} active prediction(s): {e}")
+
+
+def _active_pred_writer_loop():
+    while True:
+        batch = [_active_pred_queue.get()]
+        deadline = time.monotonic() + ACTIVE_PREDICTION_FLUSH_SECONDS
+        while len(batch) < ACTIVE_PREDICTION_MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_active_pred_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _write_active_predictions(batch)
+        for _ in batch:
+            _active_pred_queue.task_done()
+
+
+def flush_active_predictions():
+    """Block until every queued active prediction has been written"""
+    if _active_pred_writer is not None:
+        _active_pred_queue.join()
+
+
+def _flush_active_predictions_at_exit():
+    """Write anything still queued at interpreter exit"""
+    pending = []
+    while True:
+        try:
+            pending.append(_active_pred_queue.get_nowait())
+        except queue.Empty:
+            break
+    if pending:
+        _write_active_predictions(pending)
+
+
+atexit.register(_flush_active_predictions_at_exit)
+
+
 def insert_active_prediction(starttime: int, video_no: int, probe: str, 
                             user_id: str = None, session_id: str = None) -> bool:
     """
-    Insert active prediction (for frontend display)
+    Queue an active prediction (for frontend display) for the background writer
     
     Args:
         starttime: Prediction timestamp
@@ -563,15 +868,18 @@ def insert_active_prediction(starttime: int, video_no: int, probe: str,
         session_id: Session identifier (optional, for tracking)
     
     Returns:
-        bool: Success status
+        bool: Success status (the document was queued; written within
+              ACTIVE_PREDICTION_FLUSH_SECONDS)
     """
+    global _active_pred_writer
     try:
-        collection = get_collection('active_predictions')
+        now = datetime.now()
         document = {
             'starttime': int(starttime),
             'video_no': int(video_no),
             'probe': str(probe),
-            'created_at': datetime.now()
+            'created_at': now,
+            'expires_at': now + timedelta(seconds=ACTIVE_PREDICTION_TTL_SECONDS)
         }
         
         # Add user_id if provided (backward compatible)
@@ -582,7 +890,13 @@ def insert_active_prediction(starttime: int, video_no: int, probe: str,
         if session_id is not None:
             document['session_id'] = str(session_id)
         
-        collection.insert_one(document)
+        if _active_pred_writer is None:
+            with _active_pred_writer_lock:
+                if _active_pred_writer is None:
+                    _active_pred_writer = threading.Thread(target=_active_pred_writer_loop,
+                                                           daemon=True, name="ActivePredictionWriter")
+                    _active_pred_writer.start()
+        _active_pred_queue.put_nowait(document)
         return True
     except Exception as e:
         logger.error(f"Error inserting active prediction: {e}")
@@ -594,6 +908,10 @@ def get_active_predictions(video_no: Optional[int] = None, user_id: Optional[str
     """
     Get active predictions (for frontend)
     
+    Does not wait for the background writer: predictions queued within the
+    last ACTIVE_PREDICTION_FLUSH_SECONDS may not be returned yet, and the
+    frontend picks them up on its next poll.
+    
     Args:
         video_no: Optional video filter
         user_id: Optional user filter (for multi-user support)
@@ -604,7 +922,7 @@ def get_active_predictions(video_no: Optional[int] = None, user_id: Optional[str
     """
     try:
         collection = get_collection('active_predictions')
-        query = {}
+        query = {'expires_at': active_prediction_live_filter()}
         
         # Build query with provided filters (backward compatible)
         if video_no is not None:
@@ -625,6 +943,9 @@ def clear_active_predictions(video_no: Optional[int] = None) -> bool:
     """
     Clear active predictions (called before video ends)
     
+    Marks the documents expired; readers stop returning them immediately and
+    the TTL index deletes them on its next pass.
+    
     Args:
         video_no: Optional - clear only for specific video
     
@@ -632,10 +953,15 @@ def clear_active_predictions(video_no: Optional[int] = None) -> bool:
         bool: Success status
     """
     try:
+        # Queued inserts predate the clear, so write them first
+        flush_active_predictions()
         collection = get_collection('active_predictions')
-        query = {'video_no': video_no} if video_no is not None else {}
-        result = collection.delete_many(query)
-        logger.info(f"🗑️  Cleared {result.deleted_count} active predictions")
+        now = datetime.now()
+        query = {'expires_at': {'$not': {'$lte': now}}}
+        if video_no is not None:
+            query['video_no'] = video_no
+        result = collection.update_many(query, {'$set': {'expires_at': now}})
+        logger.info("🗑️  Cleared %d active predictions", result.modified_count)
         return True
     except Exception as e:
         logger.error(f"Error clearing active predictions: {e}")
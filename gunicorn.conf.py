@@ -0,0 +1,24 @@
+"""
+Gunicorn Configuration for the SURJA API Server
+Usage (from the repository root):
+    gunicorn -c gunicorn.conf.py api.server:app
+
+Uses threaded workers rather than gevent: video processing runs CPU-bound
+pandas/Keras work on background threads inside the API process, which would
+starve a gevent hub. PyMongo releases the GIL on socket I/O, so request threads
+still overlap their MongoDB round-trips.
+
+Active video sessions live in process memory (api/video_session_manager.py),
+so keep a single worker unless session state is moved to a shared store.
+"""
+
+import os
+
+bind = os.environ.get("SURJA_API_BIND", "0.0.0.0:5000")
+worker_class = "gthread"
+workers = int(os.environ.get("SURJA_API_WORKERS", "1"))
+threads = int(os.environ.get("SURJA_API_THREADS", "32"))
+timeout = 60
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
@@ -7,6 +7,7 @@ from sklearn.preprocessing import StandardScaler
 import numpy as np
 # import mysql.connector
 # from mysql.connector import errorcode
+import threading
 import time
 from tensorflow.keras.models import load_model
 from keras.layers import PReLU
@@ -28,13 +29,39 @@ def create_dataset(dataset, look_back=1):
         dataX.append(a)
         # dataY.append(dataset[(i + look_back)-1, 5])
     return np.array(dataX)
-def get_model_prediction(test, nearest_centroid_index, starttime, v_no, user_id=None, session_id=None):
 
-    loaded_model = load_model(f"3_pwindow_lstm_model{nearest_centroid_index}.h5",
-                              custom_objects={ 'PReLU': PReLU })
-    loaded_model.summary()
+
+# LSTM models keyed by cluster index; loading the .h5 file dominates a single prediction
+_cluster_models = {}
+_cluster_models_lock = threading.Lock()
+
+
+def load_cluster_model(nearest_centroid_index):
+    with _cluster_models_lock:
+        model = _cluster_models.get(nearest_centroid_index)
+        if model is None:
+            model = load_model(f"3_pwindow_lstm_model{nearest_centroid_index}.h5",
+                               custom_objects={ 'PReLU': PReLU })
+            model.summary()
+            _cluster_models[nearest_centroid_index] = model
+        return model
+
+
+def prepare_model_input(test, look_back=3):
+    # Reshape the new data into (samples, look_back, features)
+    testX = create_dataset(test, look_back)
+    testX = np.array(testX, dtype=np.float32)
+    return np.reshape(testX, (testX.shape[0], look_back, testX.shape[2]))
+
+
+def predict_classes(nearest_centroid_index, testX):
+    # testX may stack samples from several windows; one predict() call covers them all
+    loaded_model = load_cluster_model(nearest_centroid_index)
+    y_preds = loaded_model.predict(testX)  # , verbose=0)
+    return np.argmax(y_preds, axis=1)
 
 
+def record_prediction(y_pred_class, nearest_centroid_index, starttime, v_no, user_id=None, session_id=None):
 
     path = './annotation_interface/public/'
     os.makedirs(path, exist_ok=True)
@@ -47,24 +74,8 @@ def get_model_prediction(test, nearest_centroid_index, starttime, v_no, user_id=
 
 
     path2 = './Predictions/'
-    out_file2 = open(path2 + "predict.csv", "a")
 
 
-    # Reshape the new data
-    look_back = 3  # Adjust if necessary
-    testX = create_dataset(test, look_back)
-    testX = np.array(testX, dtype=np.float32)
-    testX = np.reshape(testX, (testX.shape[0], look_back, testX.shape[2]))
-
-
-    # now = datetime.now()
-    y_preds = loaded_model.predict(testX)  # , verbose=0)
-    # now2 = datetime.now()
-    # time_difference = now2 - now
-    # difference_in_milliseconds = time_difference.total_seconds() * 1000
-    # print("time taken for profile creation", difference_in_milliseconds)
-
-    y_pred_class = np.argmax(y_preds, axis=1)
     print(f"Predicted Classes: {y_pred_class}")
 
     prev_window_labels = ["HH", "HL", "LH", "LL"]
@@ -77,10 +88,11 @@ def get_model_prediction(test, nearest_centroid_index, starttime, v_no, user_id=
     # manual_pred_flag = 0
 
     # DUAL WRITE: CSV files (existing functionality)
-    out_file2.write(
-            f"{starttime},{v_no},"
-            f"{y_pred_labels[0]}\n"
-        )
+    with open(path2 + "predict.csv", "a") as out_file2:
+        out_file2.write(
+                f"{starttime},{v_no},"
+                f"{y_pred_labels[0]}\n"
+            )
 
     with open(file_path, "a") as out_file:
         out_file.write(
@@ -103,4 +115,10 @@ def get_model_prediction(test, nearest_centroid_index, starttime, v_no, user_id=
             print(f"⚠️  MongoDB insert failed for prediction: {e}. CSV backup intact.")
 
     y_pred_class = np.array([1])
-    return y_pred_class
\ No newline at end of file
+    return y_pred_class
+
+
+def get_model_prediction(test, nearest_centroid_index, starttime, v_no, user_id=None, session_id=None):
+    testX = prepare_model_input(test)
+    y_pred_class = predict_classes(nearest_centroid_index, testX)
+    return record_prediction(y_pred_class, nearest_centroid_index, starttime, v_no, user_id, session_id)
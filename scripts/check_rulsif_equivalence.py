@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+RuLSIF Regression Check
+
+Compares the batched RuLSIF in cal_change_point.py against the pinned
+densratio package (requirements_venv.txt) window by window, in both
+directions. densratio draws its kernel centers at random; the check forces
+them to all numerator samples, which is what cal_change_point.py uses.
+
+Usage:
+    python scripts/check_rulsif_equivalence.py                 # synthetic GSR/HR series
+    python scripts/check_rulsif_equivalence.py test/online_X.csv   # recorded signals
+"""
+
+import sys
+import os
+from importlib.metadata import version
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import densratio
+import densratio.RuLSIF as densratio_rulsif
+
+from cal_change_point import rulsif_window_scores
+
+WINDOW_SIZE = 50
+ALPHA = 0.1  # same as get_change_point_scores
+RTOL = 1e-6
+ATOL = 1e-9
+
+
+def synthetic_signals(n_windows=12, seed=0):
+    """Integer GSR (hundreds) / HR readings with a level shift every few windows"""
+    rng = np.random.default_rng(seed)
+    n = (n_windows + 2) * WINDOW_SIZE
+    gsr = 400 + rng.integers(-5, 6, n) + 40 * ((np.arange(n) // (3 * WINDOW_SIZE)) % 2)
+    hr = 75 + rng.integers(-3, 4, n) + 10 * ((np.arange(n) // (4 * WINDOW_SIZE)) % 2)
+    return np.column_stack([gsr, hr]).astype(np.float32)
+
+
+def load_signals(path):
+    import pandas as pd
+    return pd.read_csv(path)[['GSR', 'HR']].to_numpy(dtype=np.float32)
+
+
+def main():
+    print(f"densratio {version('densratio')}")
+    data = load_signals(sys.argv[1]) if len(sys.argv) > 1 else synthetic_signals()
+    starts = list(range(0, len(data) - 2 * WINDOW_SIZE, WINDOW_SIZE))
+
+    scores_x_y, scores_y_x = rulsif_window_scores(data, starts, WINDOW_SIZE, ALPHA)
+
+    # Centers = every numerator sample, in order (kernel_num == n samples <= 100)
+    densratio_rulsif.randint = lambda high, size: np.arange(size)
+
+    failures = 0
+    for n, i in enumerate(starts):
+        x = data[i:i + WINDOW_SIZE].astype(np.float64)
+        y = data[i + WINDOW_SIZE:i + 2 * WINDOW_SIZE].astype(np.float64)
+        ref_x_y = densratio.densratio(x, y, ALPHA, verbose=False).alpha_PE
+        ref_y_x = densratio.densratio(y, x, ALPHA, verbose=False).alpha_PE
+        ok = (np.isclose(scores_x_y[n], ref_x_y, rtol=RTOL, atol=ATOL)
+              and np.isclose(scores_y_x[n], ref_y_x, rtol=RTOL, atol=ATOL))
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} window {n:3d}: "
+              f"x->y {scores_x_y[n]:.6g} vs {ref_x_y:.6g}, "
+              f"y->x {scores_y_x[n]:.6g} vs {ref_y_x:.6g}")
+
+    if failures:
+        print(f"\n❌ {failures}/{len(starts)} windows differ from densratio")
+        sys.exit(1)
+    print(f"\n✅ All {len(starts)} windows match densratio")
+
+
+if __name__ == "__main__":
+    main()
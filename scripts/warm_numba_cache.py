@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Warm-up Script: Prime the Numba cache for cal_physiological_diff
+
+Compiles the window-mean kernel once with dummy data so its cache=True
+artifacts are written next to the module. Later processes load the cached
+machine code instead of paying the JIT compile on their first long recording.
+Run once after install/upgrade (no-op when numba is not installed).
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cal_physiological_diff as cpd
+
+
+def main():
+    if not cpd.NUMBA_AVAILABLE:
+        print("⚠️  numba not installed - nothing to warm up (NumPy path is used)")
+        return
+
+    window = 50
+    data = np.zeros((cpd.NUMBA_MIN_SAMPLES, 2), dtype=np.float32)
+    n_windows = (len(data) - 1) // window
+    cpd.block_absdiff(data, n_windows, window, 0.0, 0.0)
+    print("✅ Numba kernel compiled and cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -123,7 +123,7 @@ echo ""
 echo -e "${GREEN}TERMINAL 4: Backend API Server${NC}"
 echo "  cd $(pwd)"
 echo "  source venv_db/bin/activate"
-echo "  python api/server.py"
+echo "  gunicorn -c gunicorn.conf.py api.server:app"
 echo ""
 
 echo -e "${GREEN}TERMINAL 5: Annotations Backend${NC}"